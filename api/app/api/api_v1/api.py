@@ -6,6 +6,8 @@ from .roles.routes import router as roles_router
 from .documents.routes import router as documents_router
 from .patients.routes import router as patients_router
 from .dashboard.routes import router as dashboard_router
+from .medications.routes import router as medications_router
+from .notes.routes import router as notes_router
 
 api_router = APIRouter()
 
@@ -14,4 +16,6 @@ api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(roles_router, prefix="/roles", tags=["roles"])
 api_router.include_router(documents_router, prefix="/documents", tags=["documents"])
 api_router.include_router(patients_router, prefix="/patients", tags=["patients"])
-api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"]) 
\ No newline at end of file
+api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(medications_router, prefix="/medications", tags=["medications"])
+api_router.include_router(notes_router, prefix="/notes", tags=["notes"]) 
\ No newline at end of file
@@ -14,7 +14,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @router.post("/login", response_model=dict)
 async def login(user_credentials: UserLogin):
-    user = users_collection.find_one({"email": user_credentials.email})
+    user = await users_collection.find_one({"email": user_credentials.email})
     if not user or not verify_password(user_credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,7 +38,7 @@ async def login(user_credentials: UserLogin):
 
 @router.post("/signup", response_model=User)
 async def signup(user: UserCreate):
-    if users_collection.find_one({"email": user.email}):
+    if await users_collection.find_one({"email": user.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -51,7 +51,7 @@ async def signup(user: UserCreate):
 
     user_db = UserInDB(**user_dict)
     
-    result = users_collection.insert_one(user_db.model_dump())
+    result = await users_collection.insert_one(user_db.model_dump())
     return_user = user_db.model_dump()
     return_user["id"] = str(result.inserted_id)
     
@@ -59,7 +59,7 @@ async def signup(user: UserCreate):
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = users_collection.find_one({"email": form_data.username})
+    user = await users_collection.find_one({"email": form_data.username})
     if not user or not verify_password(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -91,7 +91,7 @@ async def refresh_token(current_token: str = Depends(oauth2_scheme)):
             )
         
         # Get user from database
-        user = users_collection.find_one({"email": email})
+        user = await users_collection.find_one({"email": email})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,7 +139,7 @@ async def get_current_user(current_token: str = Depends(oauth2_scheme)):
             )
         
         # Get user from database
-        user = users_collection.find_one({"email": email})
+        user = await users_collection.find_one({"email": email})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
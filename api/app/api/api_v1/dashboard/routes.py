@@ -34,38 +34,38 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_active_us
         one_week_ago = now - timedelta(days=7)
         
         # Count totals
-        total_patients = patients_collection.count_documents({})
-        total_files = documents_collection.count_documents({})
-        pending_uploads = documents_collection.count_documents({"status": "pending"})
+        total_patients = await patients_collection.count_documents({})
+        total_files = await documents_collection.count_documents({})
+        pending_uploads = await documents_collection.count_documents({"status": "pending"})
         
         # Active users (users who have been active in the last month)
         # For now, we'll count all active users since we don't have last_login tracking
-        active_users = users_collection.count_documents({"is_active": True})
+        active_users = await users_collection.count_documents({"is_active": True})
         
         # Previous month counts for comparison
         prev_month_start = one_month_ago - timedelta(days=30)
-        prev_month_patients = patients_collection.count_documents({
+        prev_month_patients = await patients_collection.count_documents({
             "created_at": {"$gte": prev_month_start, "$lt": one_month_ago}
         })
-        prev_month_files = documents_collection.count_documents({
+        prev_month_files = await documents_collection.count_documents({
             "created_at": {"$gte": prev_month_start, "$lt": one_month_ago}
         })
-        prev_month_pending = documents_collection.count_documents({
+        prev_month_pending = await documents_collection.count_documents({
             "status": "pending",
             "created_at": {"$gte": prev_month_start, "$lt": one_month_ago}
         })
         
         # Calculate percentage changes
         patient_change = calculate_percentage_change(
-            patients_collection.count_documents({"created_at": {"$gte": one_month_ago}}),
+            await patients_collection.count_documents({"created_at": {"$gte": one_month_ago}}),
             prev_month_patients
         )
         files_change = calculate_percentage_change(
-            documents_collection.count_documents({"created_at": {"$gte": one_month_ago}}),
+            await documents_collection.count_documents({"created_at": {"$gte": one_month_ago}}),
             prev_month_files
         )
         pending_change = calculate_percentage_change(
-            documents_collection.count_documents({
+            await documents_collection.count_documents({
                 "status": "pending",
                 "created_at": {"$gte": one_month_ago}
             }),
@@ -73,10 +73,10 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_active_us
         )
         
         # Weekly activity data
-        weekly_activity = get_weekly_activity()
+        weekly_activity = await get_weekly_activity()
         
         # Recent uploads (last 10)
-        recent_uploads = get_recent_uploads()
+        recent_uploads = await get_recent_uploads()
         
         return {
             "total_patients": total_patients,
@@ -102,7 +102,7 @@ def calculate_percentage_change(current: int, previous: int) -> int:
         return 100 if current > 0 else 0
     return int(((current - previous) / previous) * 100)
 
-def get_weekly_activity() -> List[Dict]:
+async def get_weekly_activity() -> List[Dict]:
     """Get weekly activity data for the last 7 days"""
     weekly_data = []
     now = datetime.utcnow()
@@ -114,12 +114,12 @@ def get_weekly_activity() -> List[Dict]:
         day_end = day_start + timedelta(days=1)
         
         # Count uploads for this day
-        uploads = documents_collection.count_documents({
+        uploads = await documents_collection.count_documents({
             "created_at": {"$gte": day_start, "$lt": day_end}
         })
         
         # Count processed files for this day
-        processed = documents_collection.count_documents({
+        processed = await documents_collection.count_documents({
             "status": "analyzed",
             "analyzed_at": {"$gte": day_start, "$lt": day_end}
         })
@@ -132,19 +132,19 @@ def get_weekly_activity() -> List[Dict]:
     
     return weekly_data
 
-def get_recent_uploads() -> List[Dict]:
+async def get_recent_uploads() -> List[Dict]:
     """Get recent uploads with user information"""
     try:
         # Get last 10 documents
-        recent_docs = list(documents_collection.find(
+        recent_docs = await documents_collection.find(
             {},
             {"_id": 1, "note_number": 1, "uploaded_by": 1, "status": 1, "created_at": 1, "file_path": 1}
-        ).sort("created_at", -1).limit(10))
+        ).sort("created_at", -1).limit(10).to_list()
         
         uploads = []
         for doc in recent_docs:
             # Get user info
-            user = users_collection.find_one({"_id": ObjectId(doc["uploaded_by"])})
+            user = await users_collection.find_one({"_id": ObjectId(doc["uploaded_by"])})
             
             # Calculate time ago
             time_ago = calculate_time_ago(doc["created_at"])
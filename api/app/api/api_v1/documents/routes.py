@@ -1,172 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
-import shutil
-from datetime import datetime
+import zipfile
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from ....models.document import (
+    DOCUMENT_SUMMARY,
     Document, 
     DocumentCreate, 
     DocumentStatus, 
     DocumentType, 
     DocumentAnalysisResult, 
-    DocumentExtractedData
-)
-from ....models.patient import (
-    PatientCreate,
-    Patient,
-    Gender
+    DocumentExtractedData,
+    BatchUploadResult
 )
+from ....models.ingestion_job import IngestionJob
 
-from ....core.dependencies import get_current_active_user
-from ....core.database import (
-    documents_collection, 
-    patients_collection, 
-    vital_signs_collection, 
-    dietetic_orders_collection, 
-    prescriptions_collection,
-    notes_collection
-)
+from ....core.dependencies import get_current_active_user, get_admin_user
+from ....core.database import documents_collection
 from ....core.config import get_settings
 from ....utils.document_processor import (
     DocumentProcessor,
-    StructuredData,
 )
+from ....utils.dedup import dedup_stats, discard_duplicates, find_duplicates, release_failed, visible_to
+from ....utils.ingestion import analyze_document_background, pending_document
+from ....utils.job_queue import enqueue_job, enqueue_jobs, get_job
+from ....utils.text_cache import get_text_cache
+from ....utils.analysis_pool import AnalysisPoolFull, get_analysis_pool
+from ....utils.pagination import Page, page_params, paginate
+from ....utils.projection import field_selection
+from ....utils.storage import UploadRejected, read_upload, store_file, store_upload
 
 router = APIRouter()
 settings = get_settings()
 
-def format_date(date: Optional[str], hour: Optional[str]) -> datetime:
-    if date and hour:
-        return datetime.strptime(f"{date} {hour}", "%d/%m/%Y %H:%M")
-    elif date:
-        return datetime.strptime(date, "%d/%m/%Y")
-    else:
-        return None
-
-async def create_patient(patient_data: dict):
-    """Create a new patient"""
-    gender_value = patient_data.get("Sexo", "").lower()
-    gender = Gender.MALE
-    if gender_value == "femenino" or gender_value == "f":
-        gender = Gender.FEMALE
-    elif gender_value != "masculino" and gender_value != "m":
-        gender = Gender.OTHER
-    
-    patient_create = PatientCreate(
-        names=patient_data.get("Nombres", ""),
-        paternal_lastname=patient_data.get("ApellidoPaterno", ""),
-        maternal_lastname=patient_data.get("ApellidoMaterno", ""),
-        date_of_birth=patient_data.get("FechaNacimiento", ""),
-        him=patient_data.get("HIM", None),
-        gender=gender
+def analysis_pool_full(e: AnalysisPoolFull) -> HTTPException:
+    """503 returned when the analysis pool cannot take another document"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "5"}
     )
-    
-    patient = Patient(
-        **patient_create.dict(), 
-        created_at=datetime.utcnow(), 
-        updated_at=datetime.utcnow(),
-        doctors=[]
-    )
-    result = patients_collection.insert_one(patient.dict(exclude={"id"}))
-    return str(result.inserted_id)
-
-async def add_doctor_to_patient(patient_id: str, professional_certificate: str, sign_date: Optional[datetime]):
-    """Add a doctor to a patient"""
-    patients_collection.update_one(
-        {"_id": ObjectId(patient_id)},
-        {"$push": {"doctors": {"professional_certificate": professional_certificate, "sign_date": sign_date}}}
-    )
-
-async def create_vital_signs(patient_id: str, note_id: str, vital_signs_data: dict):
-    """Create vital signs for a patient"""
-    inserted_vital_signs = {
-        "patient_id": patient_id,
-        "note_id": note_id,
-        "data": vital_signs_data,
-        "created_at": datetime.utcnow()
-    }
-    vital_signs_collection.insert_one(inserted_vital_signs)
-
-async def create_prescriptions(patient_id: str, note_id: str, prescriptions_data: dict):
-    """Create prescriptions for a patient"""
-    inserted_prescriptions = {
-        "patient_id": patient_id,
-        "note_id": note_id,
-        "data": prescriptions_data,
-        "created_at": datetime.utcnow()
-    }
-    prescriptions_collection.insert_one(inserted_prescriptions)
-
-async def create_dietetic_orders(patient_id: str, note_id: str, dietetic_orders_data: dict):
-    """Create dietetic orders for a patient"""
-    inserted_dietetic_orders = {
-        "patient_id": patient_id,
-        "note_id": note_id,
-        "data": dietetic_orders_data,
-        "created_at": datetime.utcnow()
-    }
-    dietetic_orders_collection.insert_one(inserted_dietetic_orders)
-
-async def create_note(patient_id: str, note_data: dict):
-    """Create a note for a patient"""
-    inserted_note = {
-        "patient_id": patient_id,
-        "created_at": datetime.utcnow(),
-        **note_data
-    }
-    notes_collection.insert_one(inserted_note)
-    return str(inserted_note["_id"])
-
-async def analyze_document_background(extracted_data: StructuredData, document_id: str = None):
-    """Background task for document analysis"""
-    patient_data = extracted_data.patient
-    doctor_data = extracted_data.doctor
-    note_data = extracted_data.note
-    vital_signs_data = extracted_data.vital_signs
-    dietetic_orders_data = extracted_data.dietetic_orders
-    prescriptions_data = extracted_data.prescriptions
-
-    patient_him = patient_data.get("HIM", None)
-
-    if not (existing_patient := patients_collection.find_one({"him": patient_him})):    
-        patient_id = await create_patient(patient_data)
-    else:
-        patient_id = str(existing_patient["_id"])
-
-    # Update document with patient_id if document_id is provided
-    if document_id:
-        documents_collection.update_one(
-            {"_id": ObjectId(document_id)},
-            {"$set": {"patient_id": patient_id, "status": DocumentStatus.ANALYZED.value, "updated_at": datetime.utcnow()}}
-        )
-
-    # Create note
-    note_id = await create_note(patient_id, note_data)
-
-    # Add doctor to patient
-    doctor_professional_certificate = doctor_data.get("CedulaProfesional", None)
-    doctor_sign_date = doctor_data.get("FechaCreacion", None)
-    doctor_sign_hour = doctor_data.get("HoraCreacion", None)
-
-    doctor_sign_datetime = format_date(doctor_sign_date, doctor_sign_hour)
-
-    await add_doctor_to_patient(patient_id, doctor_professional_certificate, doctor_sign_datetime)
-
-    # Create vital signs
-    vital_signs_data = vital_signs_data.get("Tabla", [])
-    await create_vital_signs(patient_id, note_id, vital_signs_data)
-
-    # Create dietetic orders
-    dietetic_orders_data = dietetic_orders_data.get("Tabla", [])
-    await create_dietetic_orders(patient_id, note_id, dietetic_orders_data)
-
-    # Create prescriptions
-    prescriptions_data = prescriptions_data.get("Tabla", [])
-    await create_prescriptions(patient_id, note_id, prescriptions_data)
-
-    return patient_id
 
 @router.post("/test-upload-process")
 async def test_document_processing(
@@ -176,26 +53,17 @@ async def test_document_processing(
     Test endpoint to process a document and return structured data immediately
     without saving to database or creating patient records. 
     Useful for testing the document processor only.
+
+    The PDF is analyzed in memory; no file is written.
     """
-    # Create a temporary file to store the uploaded document
-    upload_dir = os.path.join(os.getcwd(), "temp_uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Create a unique filename
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(upload_dir, filename)
+    try:
+        data = await read_upload(file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
     try:
-        # Save the uploaded file
-        # Make sure to reset the file cursor position
-        file.file.seek(0)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
         # Process the document
-        document_processor = DocumentProcessor(file_path)
+        document_processor = DocumentProcessor(data)
         extracted_data = await document_processor.analyze()
         
         # Return the structured data without creating patients or saving to DB
@@ -204,110 +72,85 @@ async def test_document_processing(
             "message": "Document processed successfully (test mode - no data saved)",
             "extracted_data": extracted_data
         }
+    except AnalysisPoolFull as e:
+        raise analysis_pool_full(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing document: {str(e)}"
         )
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(file_path):
-            os.remove(file_path)
 
 
-@router.post("/upload", response_model=Document)
+@router.post("/upload", response_model=Document, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
-    background_tasks: BackgroundTasks,
+    response: Response,
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Upload a new document (PDF) for processing and automatic data extraction"""
+    """
+    Upload a new document (PDF) for processing and automatic data extraction.
+
+    The file is stored and an ingestion job is queued; the document is analyzed by
+    an ingestion worker (`python worker.py`). Poll the document or
+    GET /documents/jobs/{job_id} to follow its status.
+
+    If a document with the same content was already uploaded, that document is
+    returned with status 200 and nothing is processed again; 409 if the user
+    cannot read it. A document whose ingestion failed is not reused:
+    the upload is processed again as a new document.
+    """
     
-    # Ensure upload directory exists
-    upload_dir = os.path.join(os.getcwd(), "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
+    # Store the file in the upload directory (shared with the ingestion workers)
+    try:
+        stored = await store_upload(file, os.path.abspath(settings.upload_dir))
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    file_path = stored.path
     
-    # Create a unique filename
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(upload_dir, filename)
+    await release_failed([stored.sha256])
+    existing = (await find_duplicates([stored.sha256])).get(stored.sha256)
+    if existing is None:
+        try:
+            result = await documents_collection.insert_one(pending_document(stored, current_user["id"]))
+        except DuplicateKeyError:
+            # Otra carga del mismo archivo se insertó primero
+            existing = (await find_duplicates([stored.sha256])).get(stored.sha256)
+            if existing is None:
+                # ...y se eliminó al fallar su propia carga
+                os.remove(file_path)
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Concurrent upload of the same document failed, please retry")
+        except Exception as e:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error storing document: {str(e)}"
+            )
+
+    if existing is not None:
+        await discard_duplicates([stored])
+        if not visible_to(existing, current_user):
+            # No se expone un documento que el usuario no puede leer
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A document with the same content was already uploaded"
+            )
+        existing["id"] = str(existing.pop("_id"))
+        response.status_code = status.HTTP_200_OK
+        return existing
     
     try:
-        # Save the uploaded file
-        # Make sure to reset the file cursor position
-        file.file.seek(0)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process the document and extract data first
-        document_processor = DocumentProcessor(file_path)
-        extracted_data = await document_processor.analyze()
-        
-        # Extract metadata from the processed document
-        patient_data = extracted_data.patient if extracted_data.patient else {}
-        doctor_data = extracted_data.doctor if extracted_data.doctor else {}
-        note_data = extracted_data.note if extracted_data.note else {}
-        
-        # Generate title from patient info or use filename
-        title = file.filename
-        if patient_data.get("Nombres") and patient_data.get("ApellidoPaterno"):
-            title = f"Registro Médico - {patient_data.get('Nombres')} {patient_data.get('ApellidoPaterno')}"
-        
-        # Determine document type based on content (you can enhance this logic)
-        document_type = DocumentType.MEDICAL_RECORD.value  # Default
-        
-        # Generate notes from extracted data
-        notes_parts = []
-        if doctor_data.get("CedulaProfesional"):
-            notes_parts.append(f"Dr. Cédula: {doctor_data.get('CedulaProfesional')}")
-        if note_data.get("TipoNota"):
-            notes_parts.append(f"Tipo: {note_data.get('TipoNota')}")
-        notes = " | ".join(notes_parts) if notes_parts else None
-        
-        # Extract required document fields from processed data
-        note_number = note_data.get("NoNota", "N/A")
-        note_type = note_data.get("TipoNota", "Documento Médico")
-        record_number = note_data.get("NoExpediente", None)
-        him = patient_data.get("HIM", None)
-        hospital = note_data.get("Hospital", None)
-        admission_date = note_data.get("FechaIngreso", None)
-        admission_time = note_data.get("HoraIngreso", None)
-        discharge_time = note_data.get("HoraAlta", None)
-        
-        # Create document record with extracted metadata
-        document = {
-            "note_number": note_number,
-            "note_type": note_type,
-            "record_number": record_number,
-            "him": him,
-            "hospital": hospital,
-            "admission_date": admission_date,
-            "admission_time": admission_time,
-            "discharge_time": discharge_time,
-            "file_path": file_path,
-            "uploaded_by": current_user["id"],
-            "patient_id": None,  # Will be set after patient creation in background task
-            "status": DocumentStatus.PENDING.value,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Insert into database
-        result = documents_collection.insert_one(document)
         document_id = str(result.inserted_id)
         
-        # Update status to processing
-        documents_collection.update_one(
+        # Queue the ingestion job
+        job_id = await enqueue_job(document_id, file_path)
+        await documents_collection.update_one(
             {"_id": result.inserted_id},
-            {"$set": {"status": DocumentStatus.PROCESSING.value}}
+            {"$set": {"job_id": job_id}}
         )
         
-        # Queue background processing with extracted data
-        background_tasks.add_task(analyze_document_background, extracted_data, document_id)
-        
         # Fetch the updated document
-        doc = documents_collection.find_one({"_id": result.inserted_id})
+        doc = await documents_collection.find_one({"_id": result.inserted_id})
         doc["id"] = str(doc.pop("_id"))
         
         return doc
@@ -317,23 +160,166 @@ async def upload_document(
         if os.path.exists(file_path):
             os.remove(file_path)
         
-        # If document was created, remove it from database
-        if 'result' in locals():
-            documents_collection.delete_one({"_id": result.inserted_id})
+        # Remove the document created for it
+        await documents_collection.delete_one({"_id": result.inserted_id})
         
         raise HTTPException(
             status_code=500,
-            detail=f"Error processing document: {str(e)}"
+            detail=f"Error storing document: {str(e)}"
         )
 
+def _store_batch_file(source, filename: str, upload_dir: str) -> dict:
+    """Stores one file of a batch; a rejected file becomes an error item"""
+    try:
+        return {"filename": filename, "stored": store_file(source, filename, upload_dir)}
+    except UploadRejected as e:
+        return {"filename": filename, "error": str(e)}
+    except Exception as e:
+        return {"filename": filename, "error": f"Could not store file: {str(e)}"}
+
+def _store_batch(files: List[UploadFile], upload_dir: str, max_files: int) -> List[dict]:
+    """
+    Stores every file of a batch, expanding ZIP archives member by member.
+    Returns one item per file with its stored path or the error that rejected it.
+    """
+    items = []
+
+    def store(source, filename):
+        if len(items) >= max_files:
+            items.append({"filename": filename, "error": f"Batch limit of {max_files} files reached"})
+        else:
+            items.append(_store_batch_file(source, filename, upload_dir))
+
+    for file in files:
+        file.file.seek(0)
+        if not zipfile.is_zipfile(file.file):
+            file.file.seek(0)
+            store(file.file, file.filename)
+            continue
+
+        file.file.seek(0)
+        try:
+            with zipfile.ZipFile(file.file) as archive:
+                for member in archive.infolist():
+                    # Carpetas y metadatos que agrega el compresor de macOS
+                    if member.is_dir() or member.filename.startswith("__MACOSX/"):
+                        continue
+                    # Un miembro cifrado (RuntimeError) o dañado solo falla su propio renglón;
+                    # los errores al copiarlo ya los convierte _store_batch_file
+                    try:
+                        source = archive.open(member)
+                    except Exception as e:
+                        items.append({"filename": member.filename, "error": f"Could not read ZIP member: {str(e)}"})
+                        continue
+                    with source:
+                        store(source, member.filename)
+        except zipfile.BadZipFile as e:
+            items.append({"filename": file.filename, "error": f"Invalid ZIP archive: {str(e)}"})
+
+    return items
+
+@router.post("/upload/batch", response_model=BatchUploadResult, status_code=status.HTTP_202_ACCEPTED)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Upload many documents at once: several PDF files, ZIP archives of PDFs, or both.
+
+    Every PDF is stored and gets its own document and ingestion job, inserted in
+    bulk; the ingestion workers then analyze them in parallel. A file that cannot
+    be stored is reported in its item and does not affect the rest of the batch.
+    A duplicate carries the existing document and job only if the caller may read it.
+    """
+    upload_dir = os.path.abspath(settings.upload_dir)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    # Copiar archivos es bloqueante: se hace fuera del event loop
+    items = await run_in_threadpool(_store_batch, files, upload_dir, settings.batch_max_files)
+    stored = [item for item in items if "stored" in item]
+
+    # Archivos ya cargados antes o repetidos dentro del mismo lote
+    await release_failed([item["stored"].sha256 for item in stored])
+    existing = await find_duplicates([item["stored"].sha256 for item in stored])
+    new, duplicates, seen = [], [], set()
+    for item in stored:
+        sha256 = item["stored"].sha256
+        if sha256 in existing or sha256 in seen:
+            duplicates.append(item)
+        else:
+            seen.add(sha256)
+            new.append(item)
+
+    if new:
+        records = [pending_document(item["stored"], current_user["id"]) for item in new]
+        try:
+            try:
+                await documents_collection.insert_many(records, ordered=False)
+            except BulkWriteError as e:
+                # Otra carga del mismo archivo se insertó primero: también son duplicados
+                raced = {error["index"] for error in e.details["writeErrors"] if error["code"] == 11000}
+                if len(raced) < len(e.details["writeErrors"]):
+                    raise
+                duplicates += [item for i, item in enumerate(new) if i in raced]
+                new = [item for i, item in enumerate(new) if i not in raced]
+                records = [record for i, record in enumerate(records) if i not in raced]
+
+            document_ids = [str(record["_id"]) for record in records]
+            job_ids = await enqueue_jobs([(document_id, item["stored"].path) for document_id, item in zip(document_ids, new)])
+            await documents_collection.bulk_write([
+                UpdateOne({"_id": ObjectId(document_id)}, {"$set": {"job_id": job_id}})
+                for document_id, job_id in zip(document_ids, job_ids)
+            ], ordered=False)
+        except Exception as e:
+            for item in new:
+                if os.path.exists(item["stored"].path):
+                    os.remove(item["stored"].path)
+            # insert_many asigna el _id de cada registro, aun si falla
+            await documents_collection.delete_many({"_id": {"$in": [record["_id"] for record in records if "_id" in record]}})
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error storing documents: {str(e)}"
+            )
+
+        for item, document_id, job_id in zip(new, document_ids, job_ids):
+            item["document_id"] = document_id
+            item["job_id"] = job_id
+
+    if duplicates:
+        # Después de insertar, para encontrar también los repetidos dentro del lote
+        existing = await find_duplicates([item["stored"].sha256 for item in duplicates])
+        await discard_duplicates([item["stored"] for item in duplicates])
+        for item in duplicates:
+            doc = existing.get(item["stored"].sha256)
+            if doc is None:
+                item["error"] = "Concurrent upload of the same document failed, please retry"
+                continue
+            item["duplicate"] = True
+            if visible_to(doc, current_user):
+                item["document_id"] = str(doc["_id"])
+                item["job_id"] = doc.get("job_id")
+
+    return {
+        "accepted": len(new),
+        "duplicates": len([item for item in duplicates if item.get("duplicate")]),
+        "failed": len([item for item in items if item.get("error")]),
+        "items": items
+    }
+
 @router.get("/")
 async def get_documents(
+    response: Response,
     status: Optional[DocumentStatus] = None,
     document_type: Optional[DocumentType] = None,
     patient_id: Optional[str] = None,
+    page: Page = Depends(page_params),
+    projection: Optional[dict] = Depends(field_selection(Document, DOCUMENT_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get a list of documents with optional filtering"""
+    """
+    Get a page of documents with optional filtering, newest first. The next page's
+    cursor is in the X-Next-Cursor header
+    """
     
     # Build query
     query = {}
@@ -350,24 +336,64 @@ async def get_documents(
     
     # Fetch documents
     documents_list = []
-    for doc in documents_collection.find(query):
+    for doc in await paginate(documents_collection, query, page, response, projection):
         doc["id"] = str(doc.pop("_id"))
         documents_list.append(doc)
     
     return documents_list
 
+@router.get("/text-cache/stats")
+async def get_text_cache_stats(_: dict = Depends(get_admin_user)):
+    """Get the hit/miss counters of the extracted text cache"""
+    cache = get_text_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/dedup/stats")
+async def get_dedup_stats(_: dict = Depends(get_admin_user)):
+    """Duplicate uploads returned as their existing document, and the storage and analysis they saved"""
+    return await dedup_stats()
+
+@router.get("/analysis-pool/stats")
+async def get_analysis_pool_stats(_: dict = Depends(get_admin_user)):
+    """Get the size and current load of the document analysis pool"""
+    pool = get_analysis_pool()
+    if pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **pool.stats()}
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_ingestion_job(job_id: str, current_user: dict = Depends(get_current_active_user)):
+    """Get the status of a document ingestion job"""
+    
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Access control - same rule as the document the job belongs to
+    doc = await documents_collection.find_one({"_id": ObjectId(job["document_id"])}, {"uploaded_by": 1})
+    if (current_user.get("role") != "admin" and 
+        current_user.get("role") != "doctor" and 
+        (not doc or doc.get("uploaded_by") != current_user["id"])):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to access this job"
+        )
+    
+    job["id"] = str(job.pop("_id"))
+    return job
+
 @router.get("/{document_id}", response_model=Document)
 async def get_document(document_id: str, current_user: dict = Depends(get_current_active_user)):
     """Get a specific document by ID"""
     
-    doc = documents_collection.find_one({"_id": ObjectId(document_id)})
+    doc = await documents_collection.find_one({"_id": ObjectId(document_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
     # Access control - only admins, doctors, or the uploader can view the document
-    if (current_user.get("role") != "admin" and 
-        current_user.get("role") != "doctor" and 
-        doc.get("uploaded_by") != current_user["id"]):
+    if not visible_to(doc, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to access this document"
@@ -379,12 +405,15 @@ async def get_document(document_id: str, current_user: dict = Depends(get_curren
 @router.get("/{document_id}/analyze", response_model=DocumentAnalysisResult)
 async def analyze_document(
     document_id: str, 
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Manually trigger document analysis"""
+    """
+    Manually trigger document analysis. The extracted data is stored under the
+    document, replacing its note and records if it was already analyzed, and
+    returned.
+    """
     
-    doc = documents_collection.find_one({"_id": ObjectId(document_id)})
+    doc = await documents_collection.find_one({"_id": ObjectId(document_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -398,21 +427,25 @@ async def analyze_document(
     
     # Process the document and extract data
     document_processor = DocumentProcessor(file_path)
-    extracted_data = await document_processor.analyze()
-    
-    # Queue background processing with extracted data
-    background_tasks.add_task(analyze_document_background, extracted_data)
+    try:
+        extracted_data = await document_processor.analyze()
+    except AnalysisPoolFull as e:
+        raise analysis_pool_full(e)
     
-    # Update status to processing
-    documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"status": DocumentStatus.PROCESSING.value}}
-    )
+    # Se guarda lo ya analizado, como lo haría el worker: bajo este documento,
+    # sin duplicar la nota ni sus registros, y queda ANALYZED
+    try:
+        await analyze_document_background(extracted_data, document_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error storing extracted data: {str(e)}"
+        )
     
     return {
         "document_id": document_id,
         "success": True,
-        "extracted_data": extracted_data,
+        "extracted_data": extracted_data.model_dump(),
         "error_message": None
     }
 
@@ -420,7 +453,7 @@ async def analyze_document(
 async def get_extracted_data(document_id: str, current_user: dict = Depends(get_current_active_user)):
     """Get the extracted data from an analyzed document"""
     
-    doc = documents_collection.find_one({"_id": ObjectId(document_id)})
+    doc = await documents_collection.find_one({"_id": ObjectId(document_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -431,9 +464,7 @@ async def get_extracted_data(document_id: str, current_user: dict = Depends(get_
         )
     
     # Access control
-    if (current_user.get("role") != "admin" and 
-        current_user.get("role") != "doctor" and 
-        doc.get("uploaded_by") != current_user["id"]):
+    if not visible_to(doc, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to access this document"
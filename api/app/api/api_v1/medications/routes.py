@@ -0,0 +1,107 @@
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from ....models.medication import MedicationEntry
+from ....core.dependencies import get_current_active_user
+from ....core.database import medication_entries_collection
+from ....utils.medications import clamp_entry_date, medication_key
+from ....utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, NEXT_CURSOR_HEADER
+
+router = APIRouter()
+
+MIN_SEARCH_LENGTH = 3
+# Con más claves en el $in MongoDB deja de unir en orden los rangos del índice
+# y ordena en memoria
+MAX_SEARCH_KEYS = 200
+
+@router.get("/search", response_model=List[MedicationEntry])
+async def search_medications(
+    response: Response,
+    q: str = Query(..., min_length=MIN_SEARCH_LENGTH, description="Start of the medication name, accents and case ignored"),
+    start_date: Optional[datetime] = Query(None, description="Only entries started at or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Only entries started at or before this date"),
+    cursor: Optional[str] = Query(None, description=f"Token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Prescribed medications whose name starts with `q`, across all patients, with
+    the patient, the note and the start date (Inicio), the most recent first
+    """
+    # Check if current user has permission
+    if current_user.get("role") not in ["admin", "doctor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    key = medication_key(q)
+    if not key:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The search must contain the name of a medication"
+        )
+    
+    # Las claves que empiezan con el prefijo, leídas del índice
+    keys = await medication_entries_collection.distinct("key", {"key": {"$regex": f"^{re.escape(key)}"}})
+    if len(keys) > MAX_SEARCH_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The search matches more than {MAX_SEARCH_KEYS} medications, use a longer prefix"
+        )
+    if not keys:
+        return []
+    
+    # El _id de una entrada lleva su fecha de inicio; fuera de 1970-2106 no cabe en él
+    id_range = {}
+    if start_date:
+        id_range["$gte"] = ObjectId.from_datetime(clamp_entry_date(start_date))
+    if end_date:
+        id_range["$lte"] = ObjectId(ObjectId.from_datetime(clamp_entry_date(end_date)).binary[:4] + b"\xff" * 8)
+    if cursor:
+        try:
+            id_range["$lt"] = ObjectId(cursor)
+        except (InvalidId, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    query = {"key": {"$in": keys}}
+    if id_range:
+        query["_id"] = id_range
+    
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"_id": -1}},
+        {"$limit": limit + 1},
+        # Los registros guardan el id del paciente como string
+        {"$addFields": {"patient_oid": {"$toObjectId": "$patient_id"}}},
+        {"$lookup": {
+            "from": "patients",
+            "localField": "patient_oid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"names": 1, "paternal_lastname": 1, "maternal_lastname": 1, "him": 1}}],
+            "as": "patient"
+        }},
+        {"$project": {"patient_oid": 0}},
+    ]
+    entries = await (await medication_entries_collection.aggregate(pipeline)).to_list()
+    
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(entries[-1]["_id"])
+    
+    for entry in entries:
+        entry["id"] = str(entry.pop("_id"))
+        patients = entry.pop("patient", [])
+        if patients:
+            patients[0]["id"] = str(patients[0].pop("_id"))
+            entry["patient"] = patients[0]
+    
+    return entries
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+
+from ....models.medical_note import NoteSearchHit
+from ....core.dependencies import get_current_active_user
+from ....core.database import notes_collection
+from ....utils.note_search import snippets
+
+router = APIRouter()
+
+# Los resultados se ordenan por relevancia; más allá de esto conviene afinar la búsqueda
+MAX_OFFSET = 1000
+
+@router.get("/search", response_model=List[NoteSearchHit])
+async def search_notes(
+    q: str = Query(..., min_length=2, description="Words to find in the free-text sections of the notes"),
+    patient_id: Optional[str] = Query(None, description="Only the notes of this patient"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_OFFSET),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Notes whose free-text sections contain the words of `q` (Spanish stemming,
+    accents and case ignored), the most relevant first, with a snippet of each
+    matching section
+    """
+    # Check if current user has permission
+    if current_user.get("role") not in ["admin", "doctor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    match = {"$text": {"$search": q}}
+    if patient_id:
+        match["patient_id"] = patient_id
+    
+    pipeline = [
+        {"$match": match},
+        # $sort + $limit: MongoDB solo conserva los mejores offset + limit
+        {"$sort": {"score": {"$meta": "textScore"}, "_id": -1}},
+        {"$skip": offset},
+        {"$limit": limit},
+        {"$project": {
+            "patient_id": 1, "TipoNota": 1, "NoNota": 1, "created_at": 1, "Secciones": 1,
+            "score": {"$meta": "textScore"}
+        }},
+        # Los registros guardan el id del paciente como string
+        {"$addFields": {"patient_oid": {"$toObjectId": "$patient_id"}}},
+        {"$lookup": {
+            "from": "patients",
+            "localField": "patient_oid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"names": 1, "paternal_lastname": 1, "maternal_lastname": 1, "him": 1}}],
+            "as": "patient"
+        }},
+        {"$project": {"patient_oid": 0}},
+    ]
+    notes = await (await notes_collection.aggregate(pipeline)).to_list()
+    
+    hits = []
+    for note in notes:
+        note["id"] = str(note.pop("_id"))
+        note["snippets"] = snippets(note.pop("Secciones", None), q)
+        patients = note.pop("patient", [])
+        if patients:
+            patients[0]["id"] = str(patients[0].pop("_id"))
+            note["patient"] = patients[0]
+        hits.append(note)
+    
+    return hits
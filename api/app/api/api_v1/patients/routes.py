@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
 
 from ....models.patient import Patient, PatientCreate, PatientUpdate, Gender
-from ....models.document import DocumentExtractedData, PatientInfo, Document
+from ....models.document import DOCUMENT_SUMMARY, DocumentExtractedData, PatientInfo, Document
 from ....models.medical_note import MedicalNote
 from ....models.prescription import Prescription
-from ....models.vital_signs import VitalSigns
+from ....models.vital_signs import VitalMeasurement, VitalSigns, VitalTrend
 from ....models.dietetic_order import DietticOrder
+from ....models.timeline import PatientTimeline
 from ....core.dependencies import get_current_active_user
 from ....core.database import (
     patients_collection, 
@@ -16,11 +17,75 @@ from ....core.database import (
     notes_collection,
     prescriptions_collection,
     vital_signs_collection,
-    dietetic_orders_collection
+    dietetic_orders_collection,
+    vital_measurements_collection
 )
+from ....utils.pagination import MAX_LIMIT, NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, Page, encode_cursor, page_params, paginate
+from ....utils.medications import medication_filter, medication_key
+from ....utils.projection import field_selection, projected_response
+from ....utils.timeline import notes_filter, timeline_pipeline
+from ....utils.vital_signs import MEASURES, trend_pipeline, trend_series
 
 router = APIRouter()
 
+# Campos de ?view=summary: sin las tablas `data` ni `extracted_data`
+NOTE_SUMMARY = ("TipoNota", "NoNota", "created_at")
+RECORD_SUMMARY = ("note_id", "created_at")
+
+# Puntos por medida de /vital-signs/trend
+MAX_TREND_POINTS = 2000
+
+def _date_range(start_date: Optional[str], end_date: Optional[str]) -> Optional[dict]:
+    """Date filter (created_at, or t of the measurements) between two ISO dates, None if neither is given"""
+    date_filter = {}
+    if start_date:
+        try:
+            start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+            date_filter["$gte"] = start_datetime
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid start_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
+            )
+    if end_date:
+        try:
+            end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            date_filter["$lte"] = end_datetime
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid end_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
+            )
+    return date_filter or None
+
+def _selected_measures(measures: Optional[str]) -> List[str]:
+    """Measures of a comma-separated ?measures=, all of them if it is not given"""
+    selected = [measure.strip() for measure in measures.split(",") if measure.strip()] if measures else list(MEASURES)
+    unknown = [measure for measure in selected if measure not in MEASURES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown measures: {', '.join(unknown)}"
+        )
+    return selected
+
+def _unique_doctors(doctors: List[dict]) -> List[dict]:
+    """Doctors of a patient, one per professional certificate, with their number of notes"""
+    # Get unique doctor certificates and their details
+    unique_doctors = {}
+    for doctor in doctors:
+        cert = doctor.get("professional_certificate")
+        if cert and cert not in unique_doctors:
+            unique_doctors[cert] = {
+                "professional_certificate": cert,
+                "sign_date": doctor.get("sign_date"),
+                "total_interactions": 1
+            }
+        elif cert:
+            unique_doctors[cert]["total_interactions"] += 1
+    
+    return list(unique_doctors.values())
+
 @router.post("/", response_model=Patient)
 async def create_patient(
     patient: PatientCreate,
@@ -39,16 +104,18 @@ async def create_patient(
     patient_dict["updated_at"] = datetime.utcnow()
     patient_dict["created_by"] = current_user["id"]
     
-    result = patients_collection.insert_one(patient_dict)
+    result = await patients_collection.insert_one(patient_dict)
     patient_dict["id"] = str(result.inserted_id)
     
     return patient_dict
 
 @router.get("/", response_model=List[Patient])
 async def get_patients(
+    response: Response,
+    page: Page = Depends(page_params),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get a list of patients"""
+    """Get a page of patients, newest first. The next page's cursor is in the X-Next-Cursor header"""
     # Check if current user has permission
     if current_user.get("role") not in ["admin", "doctor"]:
         raise HTTPException(
@@ -57,7 +124,7 @@ async def get_patients(
         )
     
     patients_list = []
-    for patient in patients_collection.find():
+    for patient in await paginate(patients_collection, {}, page, response):
         patient["id"] = str(patient.pop("_id"))
         patients_list.append(patient)
     
@@ -76,7 +143,7 @@ async def get_patient(
             detail="Not enough permissions"
         )
     
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -97,7 +164,7 @@ async def update_patient(
             detail="Not enough permissions"
         )
     
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -105,12 +172,12 @@ async def update_patient(
     update_data["updated_at"] = datetime.utcnow()
     
     if update_data:
-        patients_collection.update_one(
+        await patients_collection.update_one(
             {"_id": ObjectId(patient_id)},
             {"$set": update_data}
         )
     
-    updated_patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    updated_patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     updated_patient["id"] = str(updated_patient.pop("_id"))
     
     return updated_patient
@@ -129,7 +196,7 @@ async def create_patient_from_document(
         )
     
     # Get the document
-    doc = documents_collection.find_one({"_id": ObjectId(document_id)})
+    doc = await documents_collection.find_one({"_id": ObjectId(document_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -176,11 +243,11 @@ async def create_patient_from_document(
         }
         
         # Insert patient
-        result = patients_collection.insert_one(patient_data)
+        result = await patients_collection.insert_one(patient_data)
         patient_id = str(result.inserted_id)
         
         # Link document to patient
-        documents_collection.update_one(
+        await documents_collection.update_one(
             {"_id": ObjectId(document_id)},
             {"$set": {"patient_id": patient_id}}
         )
@@ -198,6 +265,7 @@ async def create_patient_from_document(
 @router.get("/{patient_id}/notes", response_model=List[MedicalNote])
 async def get_patient_notes(
     patient_id: str,
+    projection: Optional[dict] = Depends(field_selection(MedicalNote, NOTE_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get all medical notes for a specific patient"""
@@ -209,15 +277,17 @@ async def get_patient_notes(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     notes_list = []
-    for note in notes_collection.find({"patient_id": patient_id}).sort("created_at", -1):
+    async for note in notes_collection.find({"patient_id": patient_id}, projection).sort("created_at", -1):
         note["id"] = str(note.pop("_id"))
         notes_list.append(note)
     
+    if projection:
+        return projected_response(notes_list, MedicalNote)
     return notes_list
 
 @router.get("/{patient_id}/prescriptions", response_model=List[Prescription])
@@ -226,6 +296,7 @@ async def get_patient_prescriptions(
     medication_name: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    projection: Optional[dict] = Depends(field_selection(Prescription, RECORD_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get all prescriptions for a specific patient with optional filters"""
@@ -237,7 +308,7 @@ async def get_patient_prescriptions(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -245,54 +316,36 @@ async def get_patient_prescriptions(
     query = {"patient_id": patient_id}
     
     # Add date filter if provided
-    if start_date or end_date:
-        date_filter = {}
-        if start_date:
-            try:
-                start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                date_filter["$gte"] = start_datetime
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid start_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
-                )
-        if end_date:
-            try:
-                end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                date_filter["$lte"] = end_datetime
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid end_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
-                )
+    date_filter = _date_range(start_date, end_date)
+    if date_filter:
         query["created_at"] = date_filter
     
+    # Filter by the normalized medication name, from the medication_keys index
+    if medication_name:
+        # Sin letras ni dígitos el prefijo queda vacío y coincidiría con todas
+        if not medication_key(medication_name):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The medication name must contain letters or digits"
+            )
+        query.update(medication_filter(medication_name))
+    
     # Execute the query
-    prescriptions_cursor = prescriptions_collection.find(query).sort("created_at", -1)
+    prescriptions_cursor = prescriptions_collection.find(query, projection).sort("created_at", -1)
     
     prescriptions_list = []
-    for prescription in prescriptions_cursor:
+    async for prescription in prescriptions_cursor:
         prescription["id"] = str(prescription.pop("_id"))
-        
-        # Filter by medication name if provided
-        if medication_name:
-            medication_found = False
-            if prescription.get("data") and isinstance(prescription["data"], list):
-                for med in prescription["data"]:
-                    med_name = med.get("Medicamento", "").lower()
-                    if medication_name.lower() in med_name:
-                        medication_found = True
-                        break
-            if not medication_found:
-                continue
-        
         prescriptions_list.append(prescription)
     
+    if projection:
+        return projected_response(prescriptions_list, Prescription)
     return prescriptions_list
 
 @router.get("/{patient_id}/vital-signs", response_model=List[VitalSigns])
 async def get_patient_vital_signs(
     patient_id: str,
+    projection: Optional[dict] = Depends(field_selection(VitalSigns, RECORD_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get all vital signs for a specific patient"""
@@ -304,21 +357,109 @@ async def get_patient_vital_signs(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     vital_signs_list = []
-    for vital_signs in vital_signs_collection.find({"patient_id": patient_id}).sort("created_at", -1):
-        if vital_signs.get("data") and len(vital_signs.get("data", [])) > 0:
-            vital_signs["id"] = str(vital_signs.pop("_id"))
-            vital_signs_list.append(vital_signs)
-    
+    # Only the notes with vital signs (a non-empty table)
+    query = {"patient_id": patient_id, "data.0": {"$exists": True}}
+    async for vital_signs in vital_signs_collection.find(query, projection).sort("created_at", -1):
+        vital_signs["id"] = str(vital_signs.pop("_id"))
+        vital_signs_list.append(vital_signs)
+    
+    if projection:
+        return projected_response(vital_signs_list, VitalSigns)
     return vital_signs_list
 
+@router.get("/{patient_id}/vital-signs/measurements", response_model=List[VitalMeasurement], response_model_exclude_none=True)
+async def get_patient_vital_measurements(
+    patient_id: str,
+    response: Response,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    measures: Optional[str] = Query(None, description=f"Comma-separated measures, all by default: {','.join(MEASURES)}"),
+    cursor: Optional[str] = Query(None, description=f"Token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(MAX_LIMIT, ge=1, le=MAX_LIMIT),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Vital sign measurements of a patient as numbers, oldest first, read from the
+    (patient, time) index of the time-series collection
+    """
+    # Check if current user has permission
+    if current_user.get("role") not in ["admin", "doctor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    # Check if patient exists
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)}, {"_id": 1})
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    selected = _selected_measures(measures)
+
+    query = {"meta.patient_id": patient_id}
+    time_filter = _date_range(start_date, end_date) or {}
+    if cursor:
+        # Una medición por paciente y Fecha/Hora: la página sigue después de la última
+        try:
+            time_filter["$gt"] = datetime.fromisoformat(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    if time_filter:
+        query["t"] = time_filter
+
+    projection = {"_id": 0, "t": 1, "note_id": 1, **{measure: 1 for measure in selected}}
+    measurements = await vital_measurements_collection.find(query, projection).sort("t", 1).limit(limit + 1).to_list()
+
+    if len(measurements) > limit:
+        measurements = measurements[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = measurements[-1]["t"].isoformat()
+    return measurements
+
+@router.get("/{patient_id}/vital-signs/trend", response_model=VitalTrend)
+async def get_patient_vital_trend(
+    patient_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    measures: Optional[str] = Query(None, description=f"Comma-separated measures, all by default: {','.join(MEASURES)}"),
+    interval: str = Query("1h", pattern=r"^[1-9][0-9]*[mhd]$", description="Interval of each point: minutes (15m), hours (1h) or days (1d)"),
+    points: int = Query(200, ge=3, le=MAX_TREND_POINTS, description="Most points of each measure"),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Min, max, mean and last of each measure per interval over a time window,
+    grouped in MongoDB. A long stay is cut to `points` per measure with LTTB, so
+    the size of the response does not depend on its length.
+    """
+    # Check if current user has permission
+    if current_user.get("role") not in ["admin", "doctor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    # Check if patient exists
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)}, {"_id": 1})
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    selected = _selected_measures(measures)
+    pipeline = trend_pipeline(patient_id, selected, interval, _date_range(start_date, end_date))
+    buckets = await (await vital_measurements_collection.aggregate(pipeline)).to_list()
+
+    return {"interval": interval, "series": trend_series(buckets, selected, points)}
+
 @router.get("/{patient_id}/dietetic-orders", response_model=List[DietticOrder])
 async def get_patient_dietetic_orders(
     patient_id: str,
+    projection: Optional[dict] = Depends(field_selection(DietticOrder, RECORD_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get all dietetic orders for a specific patient"""
@@ -330,20 +471,23 @@ async def get_patient_dietetic_orders(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     dietetic_orders_list = []
-    for order in dietetic_orders_collection.find({"patient_id": patient_id}).sort("created_at", -1):
+    async for order in dietetic_orders_collection.find({"patient_id": patient_id}, projection).sort("created_at", -1):
         order["id"] = str(order.pop("_id"))
         dietetic_orders_list.append(order)
     
+    if projection:
+        return projected_response(dietetic_orders_list, DietticOrder)
     return dietetic_orders_list
 
 @router.get("/{patient_id}/documents", response_model=List[Document])
 async def get_patient_documents(
     patient_id: str,
+    projection: Optional[dict] = Depends(field_selection(Document, DOCUMENT_SUMMARY)),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get all documents for a specific patient"""
@@ -355,15 +499,17 @@ async def get_patient_documents(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     documents_list = []
-    for doc in documents_collection.find({"patient_id": patient_id}).sort("created_at", -1):
+    async for doc in documents_collection.find({"patient_id": patient_id}, projection).sort("created_at", -1):
         doc["id"] = str(doc.pop("_id"))
         documents_list.append(doc)
     
+    if projection:
+        return projected_response(documents_list, Document)
     return documents_list
 
 @router.get("/{patient_id}/doctors")
@@ -380,23 +526,55 @@ async def get_patient_doctors(
         )
     
     # Check if patient exists
-    patient = patients_collection.find_one({"_id": ObjectId(patient_id)})
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    return _unique_doctors(patient.get("doctors", []))
+
+@router.get("/{patient_id}/timeline", response_model=PatientTimeline)
+async def get_patient_timeline(
+    patient_id: str,
+    response: Response,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page: Page = Depends(page_params),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the patient, their doctors and a page of their notes, each with its vital
+    signs, prescriptions, dietetic orders and document
+    """
+    # Check if current user has permission
+    if current_user.get("role") not in ["admin", "doctor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    patient = await patients_collection.find_one({"_id": ObjectId(patient_id)})
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    doctors = patient.get("doctors", [])
+    created_at = _date_range(start_date, end_date)
+    pipeline = timeline_pipeline(patient_id, created_at, page.after, page.limit)
+    notes = await (await notes_collection.aggregate(pipeline)).to_list()
+    if len(notes) > page.limit:
+        notes = notes[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(notes[-1])
+    if page.include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(await notes_collection.count_documents(notes_filter(patient_id, created_at)))
     
-    # Get unique doctor certificates and their details
-    unique_doctors = {}
-    for doctor in doctors:
-        cert = doctor.get("professional_certificate")
-        if cert and cert not in unique_doctors:
-            unique_doctors[cert] = {
-                "professional_certificate": cert,
-                "sign_date": doctor.get("sign_date"),
-                "total_interactions": 1
-            }
-        elif cert:
-            unique_doctors[cert]["total_interactions"] += 1
+    for note in notes:
+        note["id"] = str(note.pop("_id"))
+        document = note.pop("document", None)
+        if document:
+            document["id"] = str(document.pop("_id"))
+            note["document"] = document
+    patient["id"] = str(patient.pop("_id"))
     
-    return list(unique_doctors.values())
\ No newline at end of file
+    return {
+        "patient": patient,
+        "doctors": _unique_doctors(patient.pop("doctors", None) or []),
+        "notes": notes
+    }
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List
+from datetime import datetime
 
 from ....models.role import Role, RoleCreate, RoleUpdate, Resource, Action
 from ....core.dependencies import get_admin_user
 from ....core.database import roles_collection, users_collection
+from ....utils.pagination import Page, page_params, paginate
 from bson import ObjectId
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Role])
-async def get_roles(_: dict = Depends(get_admin_user)):
+async def get_roles(response: Response, page: Page = Depends(page_params), _: dict = Depends(get_admin_user)):
+    """Get a page of roles, newest first. The next page's cursor is in the X-Next-Cursor header"""
     roles_list = []
-    for role in roles_collection.find():
+    for role in await paginate(roles_collection, {}, page, response):
         role["id"] = str(role.pop("_id"))
         roles_list.append(role)
     
@@ -19,7 +22,7 @@ async def get_roles(_: dict = Depends(get_admin_user)):
 
 @router.get("/{role_id}", response_model=Role)
 async def get_role(role_id: str, _: dict = Depends(get_admin_user)):
-    role = roles_collection.find_one({"_id": ObjectId(role_id)})
+    role = await roles_collection.find_one({"_id": ObjectId(role_id)})
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
@@ -28,14 +31,15 @@ async def get_role(role_id: str, _: dict = Depends(get_admin_user)):
 
 @router.post("/", response_model=Role)
 async def create_role(role: RoleCreate, _: dict = Depends(get_admin_user)):
-    if roles_collection.find_one({"name": role.name}):
+    if await roles_collection.find_one({"name": role.name}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Role already exists"
         )
     
     role_dict = role.model_dump()
-    result = roles_collection.insert_one(role_dict)
+    role_dict["created_at"] = datetime.utcnow()
+    result = await roles_collection.insert_one(role_dict)
     role_dict["id"] = str(result.inserted_id)
     
     return role_dict
@@ -46,7 +50,7 @@ async def update_role(
     role_update: RoleUpdate,
     _: dict = Depends(get_admin_user)
 ):
-    role = roles_collection.find_one({"_id": ObjectId(role_id)})
+    role = await roles_collection.find_one({"_id": ObjectId(role_id)})
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
@@ -58,19 +62,19 @@ async def update_role(
     
     update_data = {k: v for k, v in role_update.model_dump(exclude_unset=True).items() if v is not None}
     if update_data:
-        roles_collection.update_one(
+        await roles_collection.update_one(
             {"_id": ObjectId(role_id)},
             {"$set": update_data}
         )
     
-    updated_role = roles_collection.find_one({"_id": ObjectId(role_id)})
+    updated_role = await roles_collection.find_one({"_id": ObjectId(role_id)})
     updated_role["id"] = str(updated_role.pop("_id"))
     
     return updated_role
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_role(role_id: str, _: dict = Depends(get_admin_user)):
-    role = roles_collection.find_one({"_id": ObjectId(role_id)})
+    role = await roles_collection.find_one({"_id": ObjectId(role_id)})
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
@@ -81,13 +85,13 @@ async def delete_role(role_id: str, _: dict = Depends(get_admin_user)):
         )
     
     # Check if any users are using this role
-    if users_collection.find_one({"role": role["name"]}):
+    if await users_collection.find_one({"role": role["name"]}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete role while it's assigned to users"
         )
     
-    roles_collection.delete_one({"_id": ObjectId(role_id)})
+    await roles_collection.delete_one({"_id": ObjectId(role_id)})
     return None
 
 @router.get("/resources/list")
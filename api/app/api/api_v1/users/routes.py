@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List
 from datetime import datetime
 
@@ -6,13 +6,14 @@ from ....models.user import User, UserCreate, UserUpdate
 from ....core.security import get_password_hash
 from ....core.dependencies import get_current_active_user, get_admin_user
 from ....core.database import users_collection
+from ....utils.pagination import Page, page_params, paginate
 from bson import ObjectId
 
 router = APIRouter()
 
 @router.post("/", response_model=User)
 async def create_user(user: UserCreate, _: dict = Depends(get_admin_user)):
-    if users_collection.find_one({"email": user.email}):
+    if await users_collection.find_one({"email": user.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -22,8 +23,9 @@ async def create_user(user: UserCreate, _: dict = Depends(get_admin_user)):
     user_dict = user.model_dump()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
+    user_dict["created_at"] = datetime.utcnow()
     
-    result = users_collection.insert_one(user_dict)
+    result = await users_collection.insert_one(user_dict)
     user_dict["id"] = str(result.inserted_id)
     
     return User(**user_dict)
@@ -33,20 +35,18 @@ async def read_users_me(current_user: dict = Depends(get_current_active_user)):
     return current_user
 
 @router.get("/", response_model=List[User])
-async def read_users(_: dict = Depends(get_admin_user)):
+async def read_users(response: Response, page: Page = Depends(page_params), _: dict = Depends(get_admin_user)):
+    """Get a page of users, newest first. The next page's cursor is in the X-Next-Cursor header"""
     users_list = []
-    # TODO:Update this so the find already returns the values without the hashed_password
-    for user in users_collection.find():
+    for user in await paginate(users_collection, {}, page, response, {"hashed_password": 0}):
         user["id"] = str(user.pop("_id"))
-        if "hashed_password" in user:
-            user.pop("hashed_password")
         users_list.append(user)
     
     return users_list
 
 @router.get("/{user_id}", response_model=User)
 async def read_user(user_id: str, _: dict = Depends(get_admin_user)):
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_collection.find_one({"_id": ObjectId(user_id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -59,7 +59,7 @@ async def read_user(user_id: str, _: dict = Depends(get_admin_user)):
 @router.put("/{user_id}", response_model=User)
 async def update_user(user_id: str, user_update: UserUpdate, _: dict = Depends(get_admin_user)):
     # Check if user exists
-    existing_user = users_collection.find_one({"_id": ObjectId(user_id)})
+    existing_user = await users_collection.find_one({"_id": ObjectId(user_id)})
     if not existing_user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -69,7 +69,7 @@ async def update_user(user_id: str, user_update: UserUpdate, _: dict = Depends(g
     
     # Check if email is being updated and if it's already in use
     if "email" in update_fields and update_fields["email"] != existing_user["email"]:
-        if users_collection.find_one({"email": update_fields["email"]}):
+        if await users_collection.find_one({"email": update_fields["email"]}):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -88,7 +88,7 @@ async def update_user(user_id: str, user_update: UserUpdate, _: dict = Depends(g
     # Update user if there are changes
     if update_data:
         update_data["updated_at"] = datetime.utcnow()
-        result = users_collection.update_one(
+        result = await users_collection.update_one(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
@@ -96,7 +96,7 @@ async def update_user(user_id: str, user_update: UserUpdate, _: dict = Depends(g
             raise HTTPException(status_code=404, detail="User not found")
     
     # Return updated user
-    updated_user = users_collection.find_one({"_id": ObjectId(user_id)})
+    updated_user = await users_collection.find_one({"_id": ObjectId(user_id)})
     updated_user["id"] = str(updated_user.pop("_id"))
     if "hashed_password" in updated_user:
         updated_user.pop("hashed_password")
@@ -105,7 +105,7 @@ async def update_user(user_id: str, user_update: UserUpdate, _: dict = Depends(g
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: str, _: dict = Depends(get_admin_user)):
-    result = users_collection.delete_one({"_id": ObjectId(user_id)})
+    result = await users_collection.delete_one({"_id": ObjectId(user_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     return None 
\ No newline at end of file
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from .core.database import (
+    close_db,
+    medication_entries_collection,
+    prescriptions_collection,
+    vital_measurements_collection,
+    vital_signs_collection
+)
+from .core.indexes import ensure_indexes
+from .utils.medications import medication_entries, medication_keys
+from .utils.vital_signs import measurement_writes
+
+logger = logging.getLogger(__name__)
+
+async def backfill_medication_keys(batch_size: int = 500) -> int:
+    """
+    Stores the medication_keys of the prescriptions ingested before they were
+    computed. Returns the number of records updated; running it again only
+    touches the ones still missing.
+    """
+    updated = 0
+    batch = []
+    async for prescription in prescriptions_collection.find({"medication_keys": {"$exists": False}}, {"data": 1}):
+        batch.append(UpdateOne(
+            {"_id": prescription["_id"]},
+            {"$set": {"medication_keys": medication_keys(prescription.get("data"))}}
+        ))
+        if len(batch) >= batch_size:
+            updated += (await prescriptions_collection.bulk_write(batch, ordered=False)).modified_count
+            logger.info(f"{updated} prescriptions updated")
+            batch = []
+    if batch:
+        updated += (await prescriptions_collection.bulk_write(batch, ordered=False)).modified_count
+    return updated
+
+async def _replace_entries(prescriptions: list) -> int:
+    """Replaces the medication entries of the notes of these prescriptions"""
+    entries = [entry for prescription in prescriptions for entry in medication_entries(prescription)]
+    await medication_entries_collection.delete_many({"note_id": {"$in": [p["note_id"] for p in prescriptions]}})
+    if entries:
+        await medication_entries_collection.insert_many(entries, ordered=False)
+    return len(entries)
+
+async def backfill_medication_entries(batch_size: int = 500) -> int:
+    """
+    Rebuilds the medication_entries of every prescriptions record, replacing the
+    ones of each note, so it can run again at any time. Returns the number of
+    entries written.
+    """
+    written = 0
+    batch = []
+    async for prescription in prescriptions_collection.find({"note_id": {"$ne": None}}):
+        batch.append(prescription)
+        if len(batch) >= batch_size:
+            written += await _replace_entries(batch)
+            logger.info(f"{written} medication entries written")
+            batch = []
+    if batch:
+        written += await _replace_entries(batch)
+    return written
+
+async def _replace_measurements(vital_signs: list) -> int:
+    """Replaces the measurements of the notes of these vital signs records, in order"""
+    writes = [write for record in vital_signs for write in measurement_writes(record)]
+    result = await vital_measurements_collection.bulk_write(writes)
+    return result.inserted_count
+
+async def backfill_vital_measurements(batch_size: int = 500) -> int:
+    """
+    Rebuilds the vital_measurements of every vital signs record, oldest note
+    first, so at each time a patient keeps the measurement of the latest note as
+    the ingestion does. It replaces the ones of each note, so it can run again at
+    any time. Returns the number of measurements written.
+    """
+    written = 0
+    batch = []
+    # El _id de la nota es el del documento: orden de llegada, desde el índice de _id
+    async for vital_signs in vital_signs_collection.find({"note_id": {"$ne": None}}).sort("_id", 1):
+        batch.append(vital_signs)
+        if len(batch) >= batch_size:
+            written += await _replace_measurements(batch)
+            logger.info(f"{written} vital sign measurements written")
+            batch = []
+    if batch:
+        written += await _replace_measurements(batch)
+    return written
+
+async def _main(batch_size: int):
+    await ensure_indexes()
+    try:
+        updated = await backfill_medication_keys(batch_size)
+        logger.info(f"Done: {updated} prescriptions updated")
+        written = await backfill_medication_entries(batch_size)
+        logger.info(f"Done: {written} medication entries written")
+        measured = await backfill_vital_measurements(batch_size)
+        logger.info(f"Done: {measured} vital sign measurements written")
+    finally:
+        await close_db()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill in the derived fields of records ingested before they existed")
+    parser.add_argument("--batch-size", type=int, default=500, help="records per bulk write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(_main(args.batch_size))
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,26 @@ class Settings(BaseSettings):
     # Add more configuration variables as needed
     project_name: str = "Medical Records API"
     api_v1_prefix: str = "/api/v1"
+
+    # Document processing
+    upload_dir: str = "uploads"  # Compartido entre la API y los workers (p. ej. un volumen de red)
+    batch_max_files: int = 500  # Archivos por carga masiva (contando los de cada ZIP)
+    upload_max_bytes: int = 50 * 1024 * 1024  # Tamaño máximo de un PDF subido
+    upload_max_pages: int = 500  # Páginas máximas de un PDF subido
+    pdf_extraction_workers: int = 1  # Procesos para extraer páginas en paralelo (1 = serial)
+    text_cache_enabled: bool = True
+    text_cache_dir: str = "cache/text"
+    text_cache_disk_bytes: int = 512 * 1024 * 1024
+    text_cache_memory_bytes: int = 64 * 1024 * 1024
+    analysis_workers: int = 2  # Procesos que analizan documentos fuera del event loop (0 = en el event loop)
+    analysis_queue_size: int = 4  # Documentos en espera además de los que se analizan; lleno = 503
+
+    # Ingestion jobs
+    ingestion_lease_seconds: int = 300  # Tiempo que un worker retiene un trabajo antes de que otro pueda tomarlo
+    ingestion_heartbeat_seconds: int = 60  # Cada cuánto el worker renueva el lease del trabajo en curso
+    ingestion_max_attempts: int = 5
+    ingestion_retry_backoff_seconds: float = 30  # Espera antes del primer reintento; se duplica en cada intento
+    ingestion_poll_seconds: float = 1.0  # Espera de un worker sin trabajos antes de volver a buscar
     
     model_config = SettingsConfigDict(
         env_file=".env",
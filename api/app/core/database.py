@@ -1,8 +1,9 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from .config import get_settings
 
 settings = get_settings()
-client = MongoClient(settings.mongodb_url)
+# Cliente asíncrono: se conecta en el lifespan de la app (connect_db) o en la primera consulta
+client = AsyncMongoClient(settings.mongodb_url)
 db = client[settings.mongodb_name]
 
 # Common collections - will be used across multiple modules
@@ -15,4 +16,25 @@ prescriptions_collection = db.prescriptions # ✅
 notes_collection = db.notes # ✅
 
 medical_records_collection = db.medical_records # 🔴
-documents_collection = db.documents # 🔴
\ No newline at end of file
+documents_collection = db.documents # 🔴
+ingestion_jobs_collection = db.ingestion_jobs
+dedup_stats_collection = db.dedup_stats
+medication_entries_collection = db.medication_entries
+vital_measurements_collection = db.vital_measurements  # Time series (core.indexes)
+
+# client.bulk_write (bulkWrite de cliente, con varias colecciones) existe desde MongoDB 8.0
+MIN_SERVER_VERSION = (8, 0)
+
+async def connect_db():
+    """Opens the connection pool and fails fast if MongoDB is unreachable or too old"""
+    await client.aconnect()
+    await client.admin.command("ping")
+    server = await client.server_info()
+    if tuple(server["versionArray"][:2]) < MIN_SERVER_VERSION:
+        raise RuntimeError(
+            f"MongoDB {'.'.join(map(str, MIN_SERVER_VERSION))} or later is required to store the analyzed notes, "
+            f"the server runs {server['version']}"
+        )
+
+async def close_db():
+    await client.close()
@@ -22,7 +22,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    user = users_collection.find_one({"email": email})
+    user = await users_collection.find_one({"email": email})
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,128 @@
+"""
+Indexes of every collection, applied at startup by init_db and by the ingestion
+workers. Creating an index that already exists with the same keys and options is
+a no-op, so ensure_indexes can run on every start.
+
+Each entry is the query it serves; benchmarks/check_index_usage checks with
+explain() that those queries use them. The time-series collections of TIMESERIES
+are created first, since an insert would create a regular collection.
+"""
+
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from .database import db
+from ..utils.note_search import TEXT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Filtros de los índices parciales. MongoDB solo elige un índice parcial si la
+# consulta incluye su filtro, así que las consultas que los usan lo repiten
+PATIENT_HIM_FILTER = {"$type": "string", "$gt": ""}
+DOCUMENT_HASH_FILTER = {"$type": "string"}
+
+# Orden de las listas paginadas (utils.pagination)
+PAGE_INDEX = IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)])
+
+# Colecciones de series de tiempo y sus opciones; no se pueden convertir después
+TIMESERIES: Dict[str, dict] = {
+    # Signos vitales por paciente (utils.vital_signs)
+    "vital_measurements": {"timeField": "t", "metaField": "meta", "granularity": "hours"},
+}
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login y cada request autenticado (get_current_user)
+        IndexModel("email", unique=True),
+        PAGE_INDEX,
+    ],
+    "roles": [
+        IndexModel("name", unique=True),
+        PAGE_INDEX,
+    ],
+    "patients": [
+        # Upsert por HIM en la ingesta; los pacientes sin HIM no se restringen
+        IndexModel("him", unique=True, partialFilterExpression={"him": PATIENT_HIM_FILTER}),
+        # Lista paginada y conteos por mes del dashboard
+        PAGE_INDEX,
+    ],
+    # Notas y datos clínicos de un paciente, del más reciente al más antiguo;
+    # las notas también por páginas en el timeline (utils.timeline)
+    "notes": [
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Búsqueda en el texto libre de las secciones (utils.note_search); una
+        # colección admite un solo índice de texto
+        IndexModel(
+            [(field, TEXT) for field in TEXT_FIELDS],
+            name="note_sections_text",
+            default_language="spanish",
+            language_override="idioma_nota"
+        ),
+    ],
+    # Los registros de cada nota se unen a ella por note_id en el timeline
+    "vital_signs": [
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel("note_id"),
+    ],
+    "prescriptions": [
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel("note_id"),
+        # Filtro por medicamento (utils.medications); multikey
+        IndexModel([("patient_id", ASCENDING), ("medication_keys", ASCENDING)]),
+    ],
+    "dietetic_orders": [
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel("note_id"),
+    ],
+    "documents": [
+        # Deduplicación por contenido; los registros de antes del hash no tienen uno
+        IndexModel("content_sha256", unique=True, partialFilterExpression={"content_sha256": DOCUMENT_HASH_FILTER}),
+        # Lista paginada (con sus filtros) y conteos del dashboard
+        PAGE_INDEX,
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("uploaded_by", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("analyzed_at", DESCENDING)]),
+    ],
+    "medication_entries": [
+        # Búsqueda por medicamento entre pacientes, por fecha de inicio (el _id)
+        IndexModel([("key", ASCENDING), ("_id", DESCENDING)]),
+        # La ingesta reemplaza las entradas de una nota
+        IndexModel("note_id"),
+    ],
+    "vital_measurements": [
+        # Serie de un paciente en un rango de fechas; también el reemplazo de las
+        # mediciones de una nota en la ingesta
+        IndexModel([("meta.patient_id", ASCENDING), ("t", ASCENDING)]),
+    ],
+    "ingestion_jobs": [
+        # claim_job: trabajos disponibles y leases vencidos
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+        IndexModel("document_id"),
+    ],
+}
+
+async def ensure_indexes():
+    """
+    Creates the missing time-series collections of TIMESERIES and the missing
+    indexes of INDEXES. An index that cannot be created, e.g. a unique one over
+    existing duplicates, is logged and skipped so the others are still created.
+    """
+    for collection, options in TIMESERIES.items():
+        try:
+            await db.create_collection(collection, timeseries=options)
+        except CollectionInvalid:
+            pass  # Ya existe
+        except OperationFailure as e:
+            logger.warning(f"Time series collection {collection} not created: {e}")
+
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                logger.warning(f"Index {index.document['name']} on {collection} not created: {e}")
@@ -1,11 +1,14 @@
+from datetime import datetime
+
 from .database import roles_collection, users_collection
+from .indexes import ensure_indexes
 from .security import get_password_hash
 from ..models.role import Resource, Action
 import logging
 
 logger = logging.getLogger(__name__)
 
-def init_roles():
+async def init_roles():
     """Initialize default roles if they don't exist"""
     default_roles = {
         "admin": {
@@ -51,24 +54,26 @@ def init_roles():
 
     # Initialize default roles
     for role_name, role_data in default_roles.items():
-        if not roles_collection.find_one({"name": role_name}):
-            roles_collection.insert_one({"name": role_name, **role_data})
+        if not await roles_collection.find_one({"name": role_name}):
+            await roles_collection.insert_one({"name": role_name, **role_data, "created_at": datetime.utcnow()})
             logger.info(f"Created default role: {role_name}")
 
-def init_admin_user():
+async def init_admin_user():
     """Create default admin user if no users exist"""
-    if users_collection.count_documents({}) == 0:
+    if await users_collection.count_documents({}) == 0:
         admin_user = {
             "email": "admin@example.com",
             "full_name": "System Administrator",
             "role": "admin",
             "hashed_password": get_password_hash("adminpassword"),
-            "is_active": True
+            "is_active": True,
+            "created_at": datetime.utcnow()
         }
-        users_collection.insert_one(admin_user)
+        await users_collection.insert_one(admin_user)
         logger.info("Created default admin user")
 
-def init_db():
+async def init_db():
     """Initialize database with default data"""
-    init_roles()
-    init_admin_user() 
\ No newline at end of file
+    await ensure_indexes()
+    await init_roles()
+    await init_admin_user() 
\ No newline at end of file
@@ -1,11 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import get_settings
+from .core.database import connect_db, close_db
 from .core.init_db import init_db
 from .api.api_v1.api import api_router
+from .utils.analysis_pool import start_analysis_pool, shutdown_analysis_pool
+from .utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to and initialize the database and start the document analysis pool on startup"""
+    await connect_db()
+    await init_db()
+    start_analysis_pool()
+    yield
+    shutdown_analysis_pool()
+    await close_db()
 
-app = FastAPI(title="Medical Records API")
+app = FastAPI(title="Medical Records API", lifespan=lifespan)
 settings = get_settings()
 
 # Configure CORS
@@ -15,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # Include all routers from the API
@@ -23,8 +39,4 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/")
 async def root():
     return {"message": "Welcome to Medical Records API"}
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    init_db() 
\ No newline at end of file
+ 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class DietticOrderBase(BaseModel):
@@ -24,4 +24,4 @@ class DietticOrder(DietticOrderBase):
     id: Optional[str] = Field(None, alias="id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    data: Optional[Dict[str, Any]] = None  # Raw extracted data 
\ No newline at end of file
+    data: Optional[List[Dict[str, Any]]] = None  # Raw extracted data 
\ No newline at end of file
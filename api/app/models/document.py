@@ -40,10 +40,31 @@ class DocumentInDB(DocumentBase):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     analyzed_at: Optional[datetime] = None
     extracted_data: Optional[Dict[str, Any]] = None
+    job_id: Optional[str] = None  # Trabajo de ingesta que analiza el documento
+    content_sha256: Optional[str] = None
+    file_size: Optional[int] = None
+    page_count: Optional[int] = None
+    error_message: Optional[str] = None
     
 class Document(DocumentInDB):
     pass
 
+# Campos de ?view=summary en las listas de documentos: todos menos el resultado del análisis
+DOCUMENT_SUMMARY = tuple(name for name in Document.model_fields if name not in ("extracted_data",))
+
+class BatchUploadItem(BaseModel):
+    filename: str
+    document_id: Optional[str] = None
+    job_id: Optional[str] = None
+    duplicate: bool = False  # Ya existía un documento con el mismo contenido
+    error: Optional[str] = None  # Motivo por el que el archivo no se aceptó
+
+class BatchUploadResult(BaseModel):
+    accepted: int
+    duplicates: int = 0
+    failed: int
+    items: List[BatchUploadItem]
+
 class DocumentAnalysisResult(BaseModel):
     document_id: str
     success: bool
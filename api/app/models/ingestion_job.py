@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"        # Esperando a un worker (o a su siguiente reintento)
+    RUNNING = "running"      # Tomado por un worker hasta lease_expires_at
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"            # Agotó sus intentos; el documento queda en FAILED
+
+class IngestionJob(BaseModel):
+    id: Optional[str] = Field(None, alias="id")
+    document_id: str
+    file_path: str
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int
+    available_at: datetime
+    lease_expires_at: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
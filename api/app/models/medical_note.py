@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from .patient import PatientSummary
+
 class MedicalNoteBase(BaseModel):
     patient_id: str
     note_type: Optional[str] = Field(None, alias="TipoNota", description="Tipo de nota")
@@ -11,6 +13,7 @@ class MedicalNoteBase(BaseModel):
     admission_date: Optional[str] = Field(None, alias="FechaIngreso", description="Fecha de ingreso")
     admission_time: Optional[str] = Field(None, alias="HoraIngreso", description="Hora de ingreso")
     discharge_time: Optional[str] = Field(None, alias="HoraAlta", description="Hora de alta")
+    sections: Optional[Dict[str, str]] = Field(None, alias="Secciones", description="Texto libre por sección")
 
 class MedicalNoteCreate(MedicalNoteBase):
     pass
@@ -25,4 +28,18 @@ class MedicalNoteUpdate(BaseModel):
 class MedicalNote(MedicalNoteBase):
     id: Optional[str] = Field(None, alias="id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    # updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    # updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class NoteSnippet(BaseModel):
+    section: str
+    text: str
+
+class NoteSearchHit(BaseModel):
+    id: str
+    patient_id: str
+    note_type: Optional[str] = Field(None, alias="TipoNota")
+    note_number: Optional[str] = Field(None, alias="NoNota")
+    created_at: Optional[datetime] = None
+    score: float
+    snippets: List[NoteSnippet] = []
+    patient: Optional[PatientSummary] = None
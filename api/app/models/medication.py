@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+from .patient import PatientSummary
+
+class MedicationEntry(BaseModel):
+    id: Optional[str] = Field(None, alias="id")
+    key: str  # Nombre normalizado (utils.medications)
+    medication: Optional[str] = None  # Como viene en la nota
+    inicio: datetime
+    patient_id: str
+    note_id: str
+    patient: Optional[PatientSummary] = None
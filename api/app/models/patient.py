@@ -31,6 +31,14 @@ class Patient(PatientBase):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     doctors: Optional[List[dict]] = None # Professional Certificate Number of each doctor that has attended the patient
 
+class PatientSummary(BaseModel):
+    # Datos del paciente en resultados de búsqueda
+    id: Optional[str] = Field(None, alias="id")
+    names: Optional[str] = None
+    paternal_lastname: Optional[str] = None
+    maternal_lastname: Optional[str] = None
+    him: Optional[str] = None
+
 class PatientUpdate(BaseModel):
     full_name: Optional[str] = None
     date_of_birth: Optional[datetime] = None
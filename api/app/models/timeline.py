@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+
+from .patient import Patient
+from .medical_note import MedicalNote
+from .document import Document
+
+class TimelineNote(MedicalNote):
+    # Tablas de los registros de la nota, unidas por note_id
+    vital_signs: List[Dict[str, Any]] = []
+    prescriptions: List[Dict[str, Any]] = []
+    dietetic_orders: List[Dict[str, Any]] = []
+    document: Optional[Document] = None  # Sin extracted_data
+
+class PatientDoctor(BaseModel):
+    professional_certificate: str
+    sign_date: Optional[Any] = None
+    total_interactions: int
+
+class PatientTimeline(BaseModel):
+    patient: Patient
+    doctors: List[PatientDoctor]
+    notes: List[TimelineNote]
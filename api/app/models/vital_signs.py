@@ -22,4 +22,28 @@ class VitalSigns(VitalSignsBase):
     id: Optional[str] = Field(None, alias="id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     # updated_at: datetime = Field(default_factory=datetime.utcnow)
-    data: Optional[List[Dict[str, Any]]] = None  # Raw extracted data 
\ No newline at end of file
+    data: Optional[List[Dict[str, Any]]] = None  # Raw extracted data 
+
+class VitalMeasurement(BaseModel):
+    # Un renglón de signos vitales como números (utils.vital_signs); None si falta la medida
+    t: datetime  # Fecha/Hora de la tabla
+    note_id: Optional[str] = None
+    fr: Optional[float] = None
+    fc: Optional[float] = None
+    pas: Optional[float] = None
+    pad: Optional[float] = None
+    sat_o2: Optional[float] = None
+    temp_c: Optional[float] = None
+    peso: Optional[float] = None
+    talla: Optional[float] = None
+
+class TrendPoint(BaseModel):
+    t: datetime  # Inicio del intervalo
+    min: float
+    max: float
+    mean: float
+    last: float
+
+class VitalTrend(BaseModel):
+    interval: str
+    series: Dict[str, List[TrendPoint]]  # Medida -> puntos, del más antiguo al más reciente
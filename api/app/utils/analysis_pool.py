@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class AnalysisPoolFull(Exception):
+    """Raised when the analysis pool already has as many documents as it can queue"""
+
+class AnalysisPool:
+    """
+    Process pool that runs the CPU-bound document analysis off the event loop.
+
+    At most `workers` documents are analyzed at a time and up to `queue_size`
+    more wait for a free process. Past that, submissions are rejected right away
+    with AnalysisPoolFull instead of piling up behind the running ones.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.pending = 0
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) in a worker process and returns its result"""
+        # Solo se llama desde el event loop, así que el contador no necesita lock
+        if self.pending >= self.capacity:
+            raise AnalysisPoolFull(f"The analysis queue is full ({self.capacity} documents)")
+
+        self.pending += 1
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. por falta de memoria): se reemplaza el pool. Todas
+            # las llamadas en curso reciben el error; solo la primera lo reemplaza, las
+            # demás no deben cancelar el trabajo ya enviado al pool nuevo
+            if self._executor is executor:
+                logger.error("An analysis worker died, restarting the analysis pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            raise
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        return {"workers": self.workers, "capacity": self.capacity, "pending": self.pending}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+_pool: Optional[AnalysisPool] = None
+
+def start_analysis_pool() -> Optional[AnalysisPool]:
+    """Starts the process-wide analysis pool (called from the app lifespan)"""
+    global _pool
+    settings = get_settings()
+    if _pool is None and settings.analysis_workers > 0:
+        _pool = AnalysisPool(settings.analysis_workers, settings.analysis_queue_size)
+    return _pool
+
+def shutdown_analysis_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+def get_analysis_pool() -> Optional[AnalysisPool]:
+    """Returns the analysis pool, or None if documents are analyzed in the event loop"""
+    return _pool
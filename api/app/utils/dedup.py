@@ -0,0 +1,75 @@
+"""
+Deduplication of uploaded documents by the SHA-256 of their content.
+
+documents.content_sha256 has a unique index, so the same PDF can only be stored
+once even when two uploads of it race. A re-upload returns the existing
+document: its copy is discarded and it gets no ingestion job, so the note, the
+patient's doctors and the vital sign, prescription and dietetic rows are not
+inserted again. The dedup_stats collection counts what was skipped.
+
+A document whose ingestion failed is not a duplicate: uploading the PDF again
+releases its hash, so the new upload gets its own document and job and the
+failed one stays as it was.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List
+
+from ..core.database import dedup_stats_collection, documents_collection
+from ..core.indexes import DOCUMENT_HASH_FILTER
+from ..models.document import DocumentStatus
+from .storage import StoredFile
+
+_STATS_ID = "documents"
+
+async def find_duplicates(hashes: List[str]) -> Dict[str, dict]:
+    """Existing documents with any of the given content hashes, by hash"""
+    if not hashes:
+        return {}
+    return {
+        doc["content_sha256"]: doc
+        async for doc in documents_collection.find({"content_sha256": {"$in": list(hashes), **DOCUMENT_HASH_FILTER}})
+    }
+
+async def release_failed(hashes: List[str]):
+    """Frees the content hashes held by failed documents, so the PDF can be uploaded again"""
+    if hashes:
+        await documents_collection.update_many(
+            {"content_sha256": {"$in": list(hashes), **DOCUMENT_HASH_FILTER}, "status": DocumentStatus.FAILED.value},
+            {"$unset": {"content_sha256": ""}}
+        )
+
+def visible_to(doc: dict, user: dict) -> bool:
+    """Whether the user may read the document: admins, doctors, or whoever uploaded it"""
+    return user.get("role") in ("admin", "doctor") or doc.get("uploaded_by") == user["id"]
+
+async def discard_duplicates(stored: List[StoredFile]):
+    """Removes the stored copies of duplicate uploads and counts the work they saved"""
+    for item in stored:
+        if os.path.exists(item.path):
+            os.remove(item.path)
+
+    if stored:
+        await dedup_stats_collection.update_one(
+            {"_id": _STATS_ID},
+            {
+                "$inc": {
+                    "duplicates": len(stored),
+                    "bytes": sum(item.size for item in stored),
+                    "pages": sum(item.pages for item in stored)
+                },
+                "$set": {"last_duplicate_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+async def dedup_stats() -> dict:
+    """Duplicate uploads so far, with the bytes stored and pages analyzed they saved"""
+    stats = await dedup_stats_collection.find_one({"_id": _STATS_ID}) or {}
+    return {
+        "duplicates": stats.get("duplicates", 0),
+        "bytes_saved": stats.get("bytes", 0),
+        "pages_saved": stats.get("pages", 0),
+        "last_duplicate_at": stats.get("last_duplicate_at")
+    }
@@ -1,11 +1,17 @@
+import asyncio
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Dict, Any, Optional, Union
 
-import pandas as pd
 from pydantic import BaseModel
 
-from .helpers import Utils, HeaderFooterToDf, ExtractTables
+from .helpers import Utils, HeaderFooterToDf, ExtractTables, SectionIndex
+from .text_cache import TextCache, get_text_cache
+from .analysis_pool import get_analysis_pool
+from ..core.config import get_settings
+
+# Ruta del PDF, sus bytes o un archivo binario abierto (p. ej. el de un UploadFile)
+PdfSource = Union[str, os.PathLike, bytes, bytearray, BinaryIO]
 
 class StructuredData(BaseModel):
     patient: dict
@@ -33,9 +39,14 @@ class DocumentProcessor:
     signos_vitales_lst = ['Fecha/Hora', 'FR', 'FC', 'PAS', 'PAD', 'SAT_O2', 'Temp_°C', 'Peso', 'Talla']
     medicamentos_hospitalarios_lst = ['Inicio', 'Medicamento', 'Frecuencia', 'Via', 'Dosis', 'UDM', 'Cantidad', 'Tipo', 'Médico']
         
-    def __init__(self, file_path: str):
-        """Initialize the document processor with a file path"""
-        self.file_path = file_path
+    def __init__(self, source: PdfSource):
+        """
+        Initialize the document processor with the path of the PDF, its bytes or a
+        binary file-like object. Bytes and file objects are analyzed in memory,
+        without writing the PDF anywhere.
+        """
+        self.source = source
+        self.file_path = source if isinstance(source, (str, os.PathLike)) else None
         self.extracted_text = ""
 
         self.note_info = {}
@@ -47,45 +58,63 @@ class DocumentProcessor:
         self.signos_vitales = {}
         self.medicamentos_hospitalarios = {}
     
-    # Función para convertir DataFrame a diccionario con las columnas requeridas 
-    def __df_to_dict(self, df, columns):
-        if df.empty:
-            return []
-        
-        df = df.rename(columns={col: col.replace(" ", "_") for col in df.columns})  # Limpia espacios
-
+    # Función para quedarse con las columnas requeridas de cada renglón de la tabla
+    def __rows_to_dict(self, rows, columns):
         data = []
-        for _, row in df.iterrows():
+        for row in rows:
+            row = {col.replace(" ", "_"): value for col, value in row.items()}  # Limpia espacios
             item = {col: row.get(col, '') for col in columns}
             data.append(item)
-        
+
         return data
 
     # Extraer el header y footer del texto extraído
     def __get_header_footer(self, text):
-        df_head = HeaderFooterToDf.get_head(text, pd.DataFrame(columns=['No_nota', 'Tipo_nota', 'No_Expediente', 'HIM']))
-        df_name = HeaderFooterToDf.get_patient_data(text, pd.DataFrame(columns=['Apellido_paterno', 'Apellido_materno', 'Nombres', 'Fecha_nacimiento', 'Sexo', 'Edad']))
-        df_medical = HeaderFooterToDf.get_medical_data(text, pd.DataFrame(columns=['Fecha_ingreso','Hora_ingreso','Hora_alta','Firmado_por', 'Cedula_profesional','Fecha_creacion','Hora_creacion', 'Hospital']))
-
-        # Comprobamos si los DataFrames no están vacíos antes de extraer los primeros registros
-        head = df_head.iloc[0].to_dict() if not df_head.empty else {}
-        patient_data = df_name.iloc[0].to_dict() if not df_name.empty else {}
-        medical = df_medical.iloc[0].to_dict() if not df_medical.empty else {}
-
-        # Combinar los diccionarios en uno solo
-        header_footer = {**head, **patient_data, **medical}
-        return header_footer
+        return HeaderFooterToDf.extraer_campos(text)
         
     # Función para manejar la extracción de datos 
     def __extract_and_validate(self, texto_extraido, seccion, columns):
-        df = ExtractTables.extraer_tabla(texto_extraido, seccion)
-        return self.__df_to_dict(df, columns)
+        rows = ExtractTables.extraer_registros(texto_extraido, seccion)
+        return self.__rows_to_dict(rows, columns)
+
+    def __read_pdf(self) -> bytes:
+        """Bytes of the PDF, whichever source it was given as"""
+        if isinstance(self.source, (bytes, bytearray)):
+            return bytes(self.source)
+        if hasattr(self.source, "read"):
+            self.source.seek(0)
+            return self.source.read()
+        with open(self.source, "rb") as f:
+            return f.read()
+
+    def __read_cached(self):
+        """Reads the PDF bytes and looks them up in the text cache"""
+        data = self.__read_pdf()
+
+        cache = get_text_cache()
+        key = TextCache.key_for(data) if cache else None
+        text = cache.get(key) if cache else None
+        return data, cache, key, text
 
     async def extract_text(self) -> str:
         """
         Extract text from PDF document
+
+        The text is looked up in the text cache by the hash of the PDF bytes,
+        so a document that was already processed is not parsed again.
         """
-        self.extracted_text = Utils.get_text_from_pdf(self.file_path)
+        return await asyncio.to_thread(self._extract_text)
+
+    def _extract_text(self) -> str:
+        data, cache, key, text = self.__read_cached()
+
+        if text is None:
+            workers = get_settings().pdf_extraction_workers
+            text = Utils.get_text_from_pdf(data, workers=workers)
+            if cache:
+                cache.put(key, text)
+
+        self.extracted_text = text
         return self.extracted_text
     
     async def process_text(self) -> Dict[str, Any]:
@@ -96,18 +125,26 @@ class DocumentProcessor:
         if not self.extracted_text:
             await self.extract_text()
 
+        await asyncio.to_thread(self._process)
+
+    def _process(self):
+        """Synchronous part of process_text, also run inside the analysis pool workers"""
         # Obtener los datos
         header_footer = self.__get_header_footer(self.extracted_text)
 
-        signos_vitales = Utils.get_signos_vitales(self.extracted_text)
-        tabla_signos_vitales = self.__extract_and_validate(self.extracted_text, "Signos Vitales", self.signos_vitales_lst)
+        # Índice de secciones: el texto se divide y se limpia una sola vez
+        indice = SectionIndex(self.extracted_text)
+
+        # Las tablas se leen como renglones, sin construir DataFrames
+        signos_vitales = Utils.get_signos_vitales(indice, tabla=False)
+        tabla_signos_vitales = self.__extract_and_validate(indice, "Signos Vitales", self.signos_vitales_lst)
 
-        diagnosticos_activos = Utils.get_diagnosticos_activos(self.extracted_text)
-        tabla_diagnosticos_activos = self.__extract_and_validate(self.extracted_text, "Diagnósticos Activos", self.diagnosticos_activos_lst)
+        diagnosticos_activos = Utils.get_diagnosticos_activos(indice, tabla=False)
+        tabla_diagnosticos_activos = self.__extract_and_validate(indice, "Diagnósticos Activos", self.diagnosticos_activos_lst)
 
-        tabla_ordenes_dieteticas = self.__extract_and_validate(self.extracted_text, "Órdenes de Dietéticas Activas", self.ordenes_dieteticas_lst)
-        tabla_ordenes_enfermeria = self.__extract_and_validate(self.extracted_text, "Órdenes de Enfermería Activas", self.ordenes_enfermeria_lst)
-        tabla_medicamentos_hospitalarios = self.__extract_and_validate(self.extracted_text, "Órdenes de Medicamentos Hospitalarios", self.medicamentos_hospitalarios_lst)
+        tabla_ordenes_dieteticas = self.__extract_and_validate(indice, "Órdenes de Dietéticas Activas", self.ordenes_dieteticas_lst)
+        tabla_ordenes_enfermeria = self.__extract_and_validate(indice, "Órdenes de Enfermería Activas", self.ordenes_enfermeria_lst)
+        tabla_medicamentos_hospitalarios = self.__extract_and_validate(indice, "Órdenes de Medicamentos Hospitalarios", self.medicamentos_hospitalarios_lst)
             
         self.note_info = {
             "NoNota": header_footer.get("No_nota", ""),
@@ -171,10 +208,36 @@ class DocumentProcessor:
         1. Extract text
         2. Process text
         3. Return structured data
+
+        When the analysis pool is running, steps 1 and 2 run in one of its worker
+        processes; the text cache is still checked here first, from a thread, like
+        the whole analysis when there is no pool, so none of it blocks the event
+        loop. Raises AnalysisPoolFull if the pool cannot take it.
         """
-        await self.extract_text()
-        await self.process_text()
+        pool = get_analysis_pool()
+        if pool is None:
+            return await asyncio.to_thread(self.analyze_blocking)
+
+        # Leer, hashear y buscar en el caché de disco también bloquea
+        data, cache, key, cached = await asyncio.to_thread(self.__read_cached)
+        # Con el texto en caché solo se manda el texto, sin los bytes del PDF
+        text, structured_data = await pool.run(_analyze_in_worker, None if cached is not None else data, cached)
+        if cache and cached is None:
+            await asyncio.to_thread(cache.put, key, text)
 
+        self.extracted_text = text
+        return structured_data
+
+    def analyze_blocking(self) -> StructuredData:
+        """
+        analyze() without the analysis pool, run entirely in the calling thread;
+        e.g. from a worker thread with asyncio.to_thread.
+        """
+        self._extract_text()
+        self._process()
+        return self._structured_data()
+
+    def _structured_data(self) -> StructuredData:
         structured_data = StructuredData(
             patient=self.patient_info,
             doctor=self.med_info,
@@ -187,3 +250,16 @@ class DocumentProcessor:
         )
 
         return structured_data
+
+def _analyze_in_worker(data: Optional[bytes], text: Optional[str]):
+    """
+    Runs extraction and processing inside an analysis pool worker. Pages are
+    extracted serially here: the pool is already the unit of parallelism.
+    """
+    if text is None:
+        text = Utils.get_text_from_pdf(data)
+
+    processor = DocumentProcessor(None)
+    processor.extracted_text = text
+    processor._process()
+    return text, processor._structured_data()
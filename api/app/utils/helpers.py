@@ -1,30 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from PyPDF2 import PdfReader
-import pandas as pd
+from typing import NamedTuple, Optional, Tuple
 import re
 
+# Pools de procesos reutilizados entre llamadas, indexados por número de workers
+_page_pools = {}
+
+def _get_page_pool(workers):
+    pool = _page_pools.get(workers)
+    if pool is None:
+        pool = _page_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+def _extract_page_range(data, start, end):
+    """Extracts the text of pages [start, end) from the PDF bytes. Runs in a worker process."""
+    reader = PdfReader(BytesIO(data))
+    return ''.join(reader.pages[i].extract_text() for i in range(start, end))
+
+def _page_ranges(num_pages, chunks):
+    """Splits num_pages into at most `chunks` contiguous, ordered [start, end) ranges."""
+    chunks = max(1, min(chunks, num_pages))
+    size, extra = divmod(num_pages, chunks)
+    ranges = []
+    start = 0
+    for n in range(chunks):
+        end = start + size + (1 if n < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
 class Utils:
     def __init__(self):
         pass
     
     @staticmethod
-    def get_text_from_pdf(pdf_path):
-        # Load the PDF
-        reader = PdfReader(pdf_path)
+    def get_text_from_pdf(pdf_path, workers=1):
+        """
+        Extracts the text of every page of a PDF and concatenates it in page order.
+
+        Parameters:
+        pdf_path (str | bytes | file-like): Path, contents or binary stream of the PDF.
+        workers (int): Number of processes to spread the pages over. With 1 (default)
+            pages are extracted serially in the current process.
+
+        Returns:
+        str: The document text, byte-identical to the serial extraction.
+        """
+        if workers <= 1:
+            # Load the PDF
+            reader = PdfReader(BytesIO(pdf_path) if isinstance(pdf_path, (bytes, bytearray)) else pdf_path)
+
+            total_text = ''
+
+            # Extract text from each page
+            for i, page in enumerate(reader.pages):
+                total_text += page.extract_text()
 
-        total_text = ''
+            return total_text
 
-        # Extract text from each page
-        for i, page in enumerate(reader.pages):
-            total_text += page.extract_text()
+        # Los workers reciben los bytes del PDF, no el lector (no es serializable)
+        if isinstance(pdf_path, (bytes, bytearray)):
+            data = bytes(pdf_path)
+        elif hasattr(pdf_path, "read"):
+            data = pdf_path.read()
+        else:
+            with open(pdf_path, "rb") as f:
+                data = f.read()
+
+        num_pages = len(PdfReader(BytesIO(data)).pages)
+        ranges = _page_ranges(num_pages, workers)
+        if len(ranges) < 2:
+            return _extract_page_range(data, 0, num_pages)
 
-        return total_text
+        pool = _get_page_pool(workers)
+        futures = [pool.submit(_extract_page_range, data, start, end) for start, end in ranges]
+        return ''.join(future.result() for future in futures)
 
     @staticmethod
-    def get_signos_vitales(text):
+    def get_signos_vitales(text, tabla=True):
         """ Takes as input the text of the "Signos Vitales" section obtained by OCR
             and divides it into the sections "Subjetivo" y "Signos" and returns
             their content.
+            A SectionIndex of the whole document is also accepted; the table is
+            still read from the section's own text, up to "Diagnósticos Activos".
+            With tabla=False the "Signos" DataFrame is not built (it is None).
         """
+        indice = text if isinstance(text, SectionIndex) else None
+        if indice is not None:
+            text = indice.texto
+
         section_start = text.find("Signos Vitales - Últimas 24 horas")
 
         if section_start == -1:
@@ -40,7 +105,8 @@ class Utils:
 
         # pass text that comes before "Subjetivo" to Diego's function (diegos_func)
         # and obtain a dataframe with the table contents
-        signos_df = ExtractTables.extraer_tabla(text, "Signos Vitales")
+        # Solo el texto de la sección: un encabezado igual en otra parte de la nota no cuenta
+        signos_df = ExtractTables.extraer_tabla(text, "Signos Vitales") if tabla else None
 
         # assign text that comes after "Subjetivo" to a variable
         subjetivo_text = text[subjetivo_start:]
@@ -49,6 +115,8 @@ class Utils:
 
     @staticmethod
     def get_diagnosticos_para_excel(pdf_path):
+        import pandas as pd
+
         total_text = Utils.get_text_from_pdf(pdf_path)
         
         subjetivo_text = Utils.get_signos_vitales(total_text)["Subjetivo"]
@@ -73,10 +141,16 @@ class Utils:
         return diagnostics_df
         
     @staticmethod
-    def get_diagnosticos_activos(text):
+    def get_diagnosticos_activos(text, tabla=True):
         """ Takes as input the text of the "Diagnósticos Activos" section obtained by OCR
             and divides it into the sub-sections and returns their content as a dict.
+            Like get_signos_vitales, it also accepts a SectionIndex of the whole document
+            and tabla=False to skip building the table DataFrame.
         """
+        indice = text if isinstance(text, SectionIndex) else None
+        if indice is not None:
+            text = indice.texto
+
         diag_activos_start = text.find("Diagnósticos Activos")
         text = text[diag_activos_start:]
 
@@ -94,10 +168,13 @@ class Utils:
         estudios_start = text.find("Comentar estudio(s)")
         plan_start = text.find("Plan de Tratamiento")
 
-        diagnosticos_activos_df = ExtractTables.extraer_tabla(text, "Diagnósticos Activos")
+        # Como en get_signos_vitales, la tabla se lee solo de la sección
+        diagnosticos_activos_df = ExtractTables.extraer_tabla(text, "Diagnósticos Activos") if tabla else None
 
         # Split the text by the header names
-        examen_fisico_text = text[examen_fisico_start:notas_start]
+        # notas_start es relativo a notas_text, que empieza en examen_fisico_start
+        examen_fisico_end = examen_fisico_start + notas_start if notas_start >= 0 else analisis_start
+        examen_fisico_text = text[examen_fisico_start:examen_fisico_end]
         analisis_text = text[analisis_start:estudios_start]
         estudios_text = text[estudios_start:plan_start]
         plan_text = text[plan_start:]
@@ -110,6 +187,39 @@ class Utils:
                 "Plan de Tratamiento": plan_text}
 
 class HeaderFooterToDf:
+    # Campos que devuelve cada parte del encabezado/pie de página
+    CAMPOS_NOTA = ('No_nota', 'Tipo_nota', 'No_Expediente', 'HIM')
+    CAMPOS_PACIENTE = ('Apellido_paterno', 'Apellido_materno', 'Nombres', 'Fecha_nacimiento', 'Sexo', 'Edad')
+    CAMPOS_MEDICOS = ('Fecha_ingreso', 'Hora_ingreso', 'Fecha_alta', 'Hora_alta', 'Firmado_por',
+                      'Cedula_profesional', 'Fecha_creacion', 'Hora_creacion', 'Hospital')
+
+    # (etiqueta, patrón, grupos): cada patrón se evalúa solo donde aparece su etiqueta,
+    # con la misma semántica que el re.findall del campo sobre todo el texto
+    _FECHA = r"\d{2}/\d{2}/\d{4}"
+    _HORA = r"\d{2}:\d{2}"
+    _ETIQUETAS = tuple((etiqueta, re.compile(patron), grupos) for etiqueta, patron, grupos in (
+        ("\nNo", r"\nNo.\s*(?P<no_nota>\d+)", ('no_nota',)),
+        ("Expediente:", r"Expediente:\s*(?P<expediente>\d+)", ('expediente',)),
+        # El nombre es lo que sigue al número HIM hasta "Fecha"
+        ("HIM:", r"HIM:\s*(?P<him>\d+)(?:\s*(?P<nombre>.*?)Fecha)?", ('him', 'nombre')),
+        ("Nombre Completo:", r"Nombre Completo:\s*(?P<nombre>.*?)Fecha", ('nombre',)),
+        ("Fecha de Nacimiento:", rf"Fecha de Nacimiento:\s*(?P<nacimiento>{_FECHA})", ('nacimiento',)),
+        ("Femenino", r"\b(?P<sexo>Femenino)\b", ('sexo',)),
+        ("Masculino", r"\b(?P<sexo>Masculino)\b", ('sexo',)),
+        ("Femenino", r"Femenino\s*\((?P<edad>\d+\s*(?:años|meses|días?))\)", ('edad',)),
+        ("Masculino", r"Masculino\s*\((?P<edad>\d+\s*(?:años|meses|días?))\)", ('edad',)),
+        ("Fecha de Ingreso:", rf"Fecha de Ingreso:\s*(?P<ingreso>{_FECHA})(?:\s*(?P<hora_ingreso>{_HORA}))?", ('ingreso', 'hora_ingreso')),
+        ("Dado de Alta:", rf"Dado de Alta:\s*(?P<alta>{_FECHA})(?:\s*(?P<hora_alta>{_HORA}))?", ('alta', 'hora_alta')),
+        # La fecha de creación es la que sigue al nombre del médico que firma
+        ("Firmado por:", rf"Firmado por:\s*(?P<firmado>[^-\n]*)-(?:\s*(?P<creacion>{_FECHA})(?:\s*(?P<hora_creacion>{_HORA}))?)?",
+         ('firmado', 'creacion', 'hora_creacion')),
+        ("Creacion:", rf"Creacion:\s*(?P<creacion>{_FECHA})(?:\s*(?P<hora_creacion>{_HORA}))?", ('creacion', 'hora_creacion')),
+        ("PROF", r"PROF.:\s*(?P<cedula>\d+)", ('cedula',)),
+        ("Hospital", r"Hospital\s*(?P<hospital>.*?)\n", ('hospital',)),
+    ))
+    _edad_re = re.compile(r"(\d+)\s*(.*)")
+    _tipo_nota_re = re.compile(r"(.+)\s*Derechos de Autor")
+
     def __init__(self):
         pass
     
@@ -117,6 +227,112 @@ class HeaderFooterToDf:
     def capitalize_first_letter(text):
         return ' '.join([word.capitalize() for word in text.split()])
 
+    @staticmethod
+    def _get_tipo_nota(text):
+        """
+        Same result as re.search(r"(.+)\s*Derechos de Autor", text), but only runs the
+        regex on the lines around the first "Derechos de Autor" instead of the whole text.
+        """
+        d = text.find("Derechos de Autor")
+        while d != -1:
+            # La coincidencia empieza en la línea de la etiqueta, o en la última línea
+            # con texto antes de ella si solo hay espacios en medio
+            inicio = text.rfind('\n', 0, d) + 1
+            if not text[inicio:d].strip():
+                j = inicio
+                while j > 0 and text[j - 1].isspace():
+                    j -= 1
+                inicio = text.rfind('\n', 0, j - 1) + 1 if j > 0 else 0
+
+            fin = text.find('\n', d)
+            fin = len(text) if fin == -1 else fin
+            while fin < len(text) and text[fin].isspace():
+                fin += 1
+            fin = min(len(text), fin + len("Derechos de Autor"))
+
+            match = HeaderFooterToDf._tipo_nota_re.search(text, inicio, fin)
+            if match:
+                return match.group(1).strip()
+            d = text.find("Derechos de Autor", d + 1)
+        return None
+
+    @staticmethod
+    def extraer_campos(text):
+        """
+        Extracts every header/footer field of a note in a single sweep over the
+        positions of their labels: each label is located with str.find and its
+        precompiled pattern is only matched there, stopping at the first match, so
+        the body of the note is never run through the regexes.
+
+        Parameters:
+        text (str): The document text.
+
+        Returns:
+        dict: The fields of CAMPOS_NOTA, CAMPOS_PACIENTE and CAMPOS_MEDICOS, with the
+        same values get_head, get_patient_data and get_medical_data produce. Fields
+        that are not found are None ('' for Firmado_por).
+        """
+        # campo -> (posición, valor) de la primera coincidencia
+        encontrados = {}
+        for etiqueta, patron, grupos in HeaderFooterToDf._ETIQUETAS:
+            pendientes = list(grupos)
+            pos = text.find(etiqueta)
+            while pos != -1 and pendientes:
+                match = patron.match(text, pos)
+                if match:
+                    for grupo in pendientes[:]:
+                        valor = match.group(grupo)
+                        if valor is None:
+                            continue
+                        pendientes.remove(grupo)
+                        if grupo not in encontrados or pos < encontrados[grupo][0]:
+                            encontrados[grupo] = (pos, valor)
+                pos = text.find(etiqueta, pos + 1)
+        encontrados = {campo: valor for campo, (_, valor) in encontrados.items()}
+
+        edad = encontrados.get('edad')
+        if edad is not None:
+            edad = " ".join(HeaderFooterToDf._edad_re.match(edad).groups())
+
+        # Split the full name into father's last name, mother's last name, and given names
+        full_name = encontrados.get('nombre')
+        full_name = full_name.strip() if full_name is not None else None
+        father_last_name, mother_last_name, names = None, None, None
+        if full_name:
+            name_parts = full_name.split()
+            father_last_name = HeaderFooterToDf.capitalize_first_letter(name_parts[0])
+            if len(name_parts) > 1:
+                mother_last_name = HeaderFooterToDf.capitalize_first_letter(name_parts[1].replace(",", "").strip())
+            if len(name_parts) > 2:
+                names = HeaderFooterToDf.capitalize_first_letter(" ".join(name_parts[2:]))
+
+        # capitalize_first_letter también quita los espacios extras
+        dc_name = HeaderFooterToDf.capitalize_first_letter(encontrados.get('firmado', ""))
+
+        hospital = encontrados.get('hospital')
+
+        return {
+            'No_nota': encontrados.get('no_nota'),
+            'Tipo_nota': HeaderFooterToDf._get_tipo_nota(text),
+            'No_Expediente': encontrados.get('expediente'),
+            'HIM': encontrados.get('him'),
+            'Apellido_paterno': father_last_name,
+            'Apellido_materno': mother_last_name,
+            'Nombres': names,
+            'Fecha_nacimiento': encontrados.get('nacimiento'),
+            'Sexo': encontrados.get('sexo'),
+            'Edad': edad,  # Now includes both number and unit (e.g., "3 meses", "1 año", "5 días")
+            'Fecha_ingreso': encontrados.get('ingreso'),
+            'Hora_ingreso': encontrados.get('hora_ingreso'),
+            'Fecha_alta': encontrados.get('alta'),
+            'Hora_alta': encontrados.get('hora_alta'),
+            'Firmado_por': dc_name,
+            'Cedula_profesional': encontrados.get('cedula'),
+            'Fecha_creacion': encontrados.get('creacion'),
+            'Hora_creacion': encontrados.get('hora_creacion'),
+            'Hospital': "Hospital " + hospital if hospital is not None else None,
+        }
+
     @staticmethod
     def get_head(text,df):
         """
@@ -130,34 +346,10 @@ class HeaderFooterToDf:
         Returns:
         pd.DataFrame: Updated DataFrame with the extracted IDs.
         """
-        # Extract 'Numero de Nota' (Note Number)
-        re_no_nota = r"\nNo.\s*([\d]+)"
-        no_nota_match = re.findall(re_no_nota, text)
-        no_nota = no_nota_match[0] if no_nota_match else None
-
-        # Extract 'Tipo de Nota' (second line in the text)
-        re_tipo_nota = r"(.+)\s*Derechos de Autor"
-        tipo_nota_match = re.search(re_tipo_nota, text)
-        tipo_nota = tipo_nota_match.group(1).strip() if tipo_nota_match else None
-
-
-        # Extract 'Numero de Expediente' (Case Number)
-        re_no_expediente = r"Expediente:\s*([\d]+)"
-        no_expediente_match = re.findall(re_no_expediente, text)
-        no_expediente = no_expediente_match[0] if no_expediente_match else None
-
-        # Extract 'HIM' identifier
-        re_him = r"HIM:\s*([\d]+)"
-        him_match = re.findall(re_him, text)
-        him = him_match[0] if him_match else None
-
-        # Add extracted data to the DataFrame
-        new_row = {
-            'No_nota': no_nota,
-            'Tipo_nota': tipo_nota,
-            'No_Expediente': no_expediente,
-            'HIM': him
-        }
+        import pandas as pd
+
+        campos = HeaderFooterToDf.extraer_campos(text)
+        new_row = {key: campos[key] for key in HeaderFooterToDf.CAMPOS_NOTA}
 
         df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
 
@@ -176,53 +368,10 @@ class HeaderFooterToDf:
         Returns:
         pd.DataFrame: Updated DataFrame with the extracted patient data.
         """
+        import pandas as pd
 
-        # Extract the full name by replacing the HIM number with "Nombre Completo" in the text
-        re_him = r"HIM:\s*([\d]+)"
-        new_header = re.sub(re_him, r" Nombre Completo: ", text)
-        re_name = r"Nombre Completo:\s*(.*?)Fecha"
-        name_match = re.findall(re_name, new_header)
-        full_name = name_match[0].strip() if name_match else None
-
-        # Split the full name into father's last name, mother's last name, and given names
-        if full_name:
-            name_parts = full_name.split()
-            father_last_name = name_parts[0] if len(name_parts) > 0 else None
-            mother_last_name = name_parts[1] if len(name_parts) > 1 else None
-            mother_last_name = mother_last_name.replace(",", "").strip()
-            names = " ".join(name_parts[2:]) if len(name_parts) > 2 else None
-        else:
-            father_last_name, mother_last_name, names = None, None, None
-
-        # Extract birth date
-        re_birth_date = r"Fecha de Nacimiento:\s*(\d{2}/\d{2}/\d{4})"
-        birth_date_match = re.findall(re_birth_date, text)
-        birth_date = birth_date_match[0] if birth_date_match else None
-
-        # Extract gender
-        re_sex = r"\b(Femenino|Masculino)\b"
-        sex_match = re.findall(re_sex, text)
-        sex = sex_match[0] if sex_match else None
-
-        # Extract age (supporting days, months, and years)
-        re_age = r"(?:Femenino|Masculino)\s*\((\d+)\s*(años|meses|días?)\)"
-        age_match = re.findall(re_age, text)
-        edad = f"{age_match[0][0]} {age_match[0][1]}" if age_match else None
-
-        # Capitalize names properly
-        father_last_name = HeaderFooterToDf.capitalize_first_letter(father_last_name)
-        mother_last_name = HeaderFooterToDf.capitalize_first_letter(mother_last_name)
-        names = HeaderFooterToDf.capitalize_first_letter(names)
-
-        # Add extracted data to the DataFrame
-        new_data = {
-            'Apellido_paterno': father_last_name,
-            'Apellido_materno': mother_last_name,
-            'Nombres': names,
-            'Fecha_nacimiento': birth_date,
-            'Sexo': sex,
-            'Edad': edad  # Now includes both number and unit (e.g., "3 meses", "1 año", "5 días")
-        }
+        campos = HeaderFooterToDf.extraer_campos(text)
+        new_data = {key: campos[key] for key in HeaderFooterToDf.CAMPOS_PACIENTE}
 
         df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
         return df
@@ -240,70 +389,8 @@ class HeaderFooterToDf:
         Returns:
         pd.DataFrame: Updated DataFrame with the extracted medical data in the first row.
         """
-
-        # Extract the hospital admission date
-        re_entry_date = r"Fecha de Ingreso:\s*(\d{2}/\d{2}/\d{4})"
-        entry_date_match = re.findall(re_entry_date, text)
-        entry_date = entry_date_match[0] if entry_date_match else None
-
-        # Extract the hospital admission time
-        re_entry_time = r"Fecha de Ingreso:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})"
-        entry_time_match = re.findall(re_entry_time, text)
-        entry_time = entry_time_match[0][1] if entry_time_match else None
-
-        # Extract the hospital discharge date
-        re_discharge_date = r"Dado de Alta:\s*(\d{2}/\d{2}/\d{4})"
-        discharge_date_match = re.findall(re_discharge_date, text)
-        discharge_date = discharge_date_match[0] if discharge_date_match else None
-
-        # Extract the hospital discharge time
-        re_discharge_time = r"Dado de Alta:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})"
-        discharge_time_match = re.findall(re_discharge_time, text)
-        discharge_time = discharge_time_match[0][1] if discharge_time_match else None
-
-        # Extract the doctor's name who signed the medical note
-        re_dc_name = r"Firmado por:\s*(.*?)-"
-        dc_name_match = re.findall(re_dc_name, text)
-        dc_name = dc_name_match[0] if dc_name_match else ""
-        # Quitamos espacios extras
-        dc_name = re.sub(r'\s+', ' ', dc_name).strip()
-        dc_name = HeaderFooterToDf.capitalize_first_letter(dc_name)
-
-        # Extract the doctor's professional license number
-        re_dc_number =  r"PROF.:\s*([\d]+)"
-        dc_number_match = re.findall(re_dc_number, text)
-        dc_number = dc_number_match[0] if dc_number_match else None
-
-        # Extract the creation date of the medical note
-        new_header = re.sub(re_dc_name, r"Creacion: ", text)
-
-        re_creation_date = r"Creacion:\s*(\d{2}/\d{2}/\d{4})"
-        creation_date_match = re.findall(re_creation_date, new_header)
-        creation_date = creation_date_match[0] if creation_date_match else None
-
-        # Extract the creation time of the medical note
-        re_creation_time = r"Creacion:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})"
-        creation_time_match = re.findall(re_creation_time, new_header)
-        creation_time = creation_time_match[0][1] if creation_time_match else None
-
-        # Extract the hospital name
-        re_hospital_name = r"Hospital\s*(.*?)\n"
-        hospital_name_match = re.findall(re_hospital_name, text)
-        hospital_name = "Hospital " + hospital_name_match[0] if hospital_name_match else None
-
-        # Add extracted data to the DataFrame
-
-        new_data = {
-            'Fecha_ingreso': entry_date,
-            'Hora_ingreso': entry_time,
-            'Fecha_alta': discharge_date,
-            'Hora_alta': discharge_time,
-            'Firmado_por': dc_name,
-            'Cedula_profesional': dc_number,
-            'Fecha_creacion': creation_date,
-            'Hora_creacion': creation_time,
-            'Hospital': hospital_name
-        }
+        campos = HeaderFooterToDf.extraer_campos(text)
+        new_data = {key: campos[key] for key in HeaderFooterToDf.CAMPOS_MEDICOS}
 
         # Add new columns to the DataFrame if they do not exist
         for key in new_data.keys():
@@ -328,6 +415,8 @@ class HeaderFooterToDf:
         Returns:
         pd.DataFrame: A DataFrame containing extracted patient and medical details.
         """
+        import pandas as pd
+
         # Initialize an empty DataFrame
         final_df = pd.DataFrame()
 
@@ -341,17 +430,48 @@ class HeaderFooterToDf:
 
         return final_df
 
+class EsquemaTabla(NamedTuple):
+    """
+    How the rows of a section table are turned into cells.
+
+    Each row starts with its date ("dd/mm/aaaa hh:mm") and the rest is split on
+    three spaces (the last piece, after the trailing separator, is dropped).
+    The cells then map to the columns as:
+    [fecha] + the first `fijas` cells + [the middle cells joined] + [the last cell].
+    With fijas=None every cell is its own column.
+    """
+    columnas: Tuple[str, ...]
+    encabezado: str                  # Prefijo del renglón de encabezados, que se ignora
+    fijas: Optional[int] = None
+    medio: bool = False
+    final: bool = False
+
 class ExtractTables:
+    # Esquema de la tabla de cada sección. Para leer una sección nueva basta con agregarla aquí
+    ESQUEMAS = {
+        "Signos Vitales": EsquemaTabla(
+            ('Fecha/Hora', 'FR', 'FC', 'PAS', 'PAD', 'SAT O2', 'Temp °C', 'Peso', 'Talla'),
+            encabezado='Fecha/Hora'),
+        "Órdenes de Dietéticas Activas": EsquemaTabla(
+            ('Fecha Ingresada', 'Tipo', 'Tipo Terapéutico', 'Notas'),
+            encabezado='Fecha'),
+        "Diagnósticos Activos": EsquemaTabla(
+            ('Fecha Ingresada', 'Descripción', 'Tipo', 'Médico', 'Notas'),
+            encabezado='Fecha', fijas=2, medio=True, final=True),
+        "Órdenes de Enfermería Activas": EsquemaTabla(
+            ('Fecha Ingresada', 'Orden', 'Médico'),
+            encabezado='Fecha', fijas=1, medio=True),
+        "Órdenes de Medicamentos Hospitalarios": EsquemaTabla(
+            ("Inicio", "Medicamento", "Frecuencia", "Via", "Dosis", "UDM", "Cantidad", "Tipo", "Médico", "Tasa de Flujo"),
+            encabezado='Inicio', fijas=7, medio=True, final=True),
+    }
+
     def __init__(self):
         pass
     
     @staticmethod
-    def pdf_a_texto(ruta):
-        reader = PdfReader(ruta)
-        documento = ""
-        for pagina in range(len(reader.pages)):
-            documento = documento + reader.pages[pagina].extract_text()
-        return documento
+    def pdf_a_texto(ruta, workers=1):
+        return Utils.get_text_from_pdf(ruta, workers=workers)
     
 
     @staticmethod
@@ -361,6 +481,8 @@ class ExtractTables:
 
     @staticmethod
     def extract_tables_from_routes(rutas, seccion):
+        import pandas as pd
+
         tablas = []
 
         for ruta in rutas:
@@ -381,26 +503,12 @@ class ExtractTables:
     
     @staticmethod
     def econtrar_seccion(lst, seccion):
-        Bandera = False
-        lst_resultado = []
-        for i in lst:
-            if(Bandera):
-                if(i == ' '):
-                    Bandera = False
-                else:
-                    date_pattern = re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}")
-                    match = date_pattern.search(i)
-                    if not(match is None):
-                        lst_resultado.append(i)
-                    else:
-                        n = lst.index(i)
-                        match1 = date_pattern.search(lst[n-1])
-                        match2 = date_pattern.search(lst[n+1])
-                        if ((not(match1 is None))&(not(match2 is None))):
-                            lst_resultado.pop()
-            if (i.startswith(seccion)):
-                Bandera = True
-        return lst_resultado
+        """
+        Returns the date rows of the table that follows each line starting with
+        `seccion`, up to the next single-space line. See SectionIndex.escanear.
+        """
+        filas, _ = SectionIndex.escanear(lst, (seccion,))
+        return filas[seccion]
     
     @staticmethod
     def eliminar_ruido(lst):
@@ -423,6 +531,8 @@ class ExtractTables:
     
     @staticmethod
     def comprobacion_final(tabla, columnas):
+        import pandas as pd
+
         No_Valido = False
         for i in tabla:
             if len(i) != len(columnas):
@@ -435,121 +545,163 @@ class ExtractTables:
 
     @staticmethod
     def extraer_tabla(documento_txt, nombre_seccion):
-        lst_documento = documento_txt.split('\n')
-        lst_documento = ExtractTables.eliminar_ruido(lst_documento)
-        tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Órdenes de Dietéticas Activas")
-        
-        match nombre_seccion:
-            case "Signos Vitales":
-                columns = ['Fecha/Hora', 'FR', 'FC', 'PAS', 'PAD', 'SAT O2', 'Temp °C', 'Peso', 'Talla']
-                tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Signos Vitales")
-                tabla = []
-                for i in tabla_seccion:
-                    if (not(i.startswith('Fecha/Hora'))):
-                        datos = []
-                        fecha = ExtractTables.extract_fecha(i)
-                        datos.append(fecha)
-                        fecha = fecha + " "
-                        tmp_string = i.replace(fecha, '')
-                        lista_dividida = tmp_string.split('   ')
-                        lista_dividida.pop()
-                        datos.extend(lista_dividida)
-                        tabla.append(datos)
-                df = ExtractTables.comprobacion_final(tabla, columns)
-                return df
-            case "Órdenes de Dietéticas Activas":
-                columns = ['Fecha Ingresada', 'Tipo', 'Tipo Terapéutico', 'Notas']
-                tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Órdenes de Dietéticas Activas")
-                tabla = []
-                for i in tabla_seccion:
-                    if (not(i.startswith('Fecha'))):
-                        datos = []
-                        fecha = ExtractTables.extract_fecha(i)
-                        datos.append(fecha)
-                        fecha = fecha + " "
-                        tmp_string = i.replace(fecha, '')
-                        lista_dividida = tmp_string.split('   ')
-                        lista_dividida.pop()
-                        datos.extend(lista_dividida)
-                        tabla.append(datos)
-
-                df = ExtractTables.comprobacion_final(tabla, columns)
-                return df
-            case "Diagnósticos Activos":
-                columns = ['Fecha Ingresada', 'Descripción', 'Tipo', 'Médico', 'Notas']
-                tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Diagnósticos Activos")
-                tabla = []
-                for i in tabla_seccion:
-                    if (not(i.startswith('Fecha'))):
-                        datos = []
-                        fecha = ExtractTables.extract_fecha(i)
-                        datos.append(fecha)
-                        fecha = fecha + " "
-                        tmp_string = i.replace(fecha, '')
-                        lista_dividida = tmp_string.split('   ')
-                        lista_dividida.pop()
-                        datos.append(lista_dividida[0])
-                        datos.append(lista_dividida[1])
-                        datofinal = lista_dividida[-1]
-                        lista_dividida.pop(0)
-                        lista_dividida.pop(0)
-                        lista_dividida.pop()
-                        cadena = ""
-                        for elemento in lista_dividida:
-                            cadena = cadena + elemento
-                        datos.append(cadena)
-                        datos.append(datofinal)
-                        tabla.append(datos)
-                df = ExtractTables.comprobacion_final(tabla, columns)
-                return df
-            case "Órdenes de Enfermería Activas":
-                columns = ['Fecha Ingresada', 'Orden', 'Médico']
-                tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Órdenes de Enfermería Activas")
-                tabla = []
-                for i in tabla_seccion:
-                    if (not(i.startswith('Fecha'))):
-                        datos = []
-                        fecha = ExtractTables.extract_fecha(i)
-                        datos.append(fecha)
-                        fecha = fecha + " "
-                        tmp_string = i.replace(fecha, '')
-                        lista_dividida = tmp_string.split('   ')
-                        lista_dividida.pop()
-                        datos.append(lista_dividida[0])
-                        lista_dividida.pop(0)
-                        cadena = ""
-                        for elemento in lista_dividida:
-                            cadena = cadena + elemento      
-                        datos.append(cadena)
-                        tabla.append(datos)
-                df = ExtractTables.comprobacion_final(tabla, columns)            
-                return df
-            case "Órdenes de Medicamentos Hospitalarios":
-                columns = ["Inicio", "Medicamento", "Frecuencia", "Via", "Dosis", "UDM", "Cantidad", "Tipo", "Médico", "Tasa de Flujo"]
-                tabla_seccion = ExtractTables.econtrar_seccion(lst_documento, "Órdenes de Medicamentos Hospitalarios")
-                tabla = []
-                for i in tabla_seccion:
-                    if (not(i.startswith('Inicio'))):
-                        datos = []
-                        fecha = ExtractTables.extract_fecha(i)
-                        datos.append(fecha)
-                        fecha = fecha + " "
-                        tmp_string = i.replace(fecha, '')
-                        lista_dividida = tmp_string.split('   ')
-                        lista_dividida.pop()
-                        datofinal = lista_dividida[-1]
-                        lista_dividida.pop()
-                        for _ in range(7):
-                            datos.append(lista_dividida[0])
-                            lista_dividida.pop(0)
-                        cadena = ""
-                        for elemento in lista_dividida:
-                            cadena = cadena + elemento
-                        datos.append(cadena)
-                        datos.append(datofinal)
-                        tabla.append(datos)
-                df = ExtractTables.comprobacion_final(tabla, columns)
-                return df
-            case _:
-                df = pd.DataFrame()           
-                return df
\ No newline at end of file
+        """
+        Extracts the table of a section as a DataFrame. See extraer_filas.
+        """
+        import pandas as pd
+
+        columns, tabla = ExtractTables.extraer_filas(documento_txt, nombre_seccion)
+        if not columns:
+            return pd.DataFrame()
+        return ExtractTables.comprobacion_final(tabla, columns)
+
+    @staticmethod
+    def extraer_registros(documento_txt, nombre_seccion):
+        """
+        Extracts the table of a section as a list of dicts (column -> cell), without
+        going through pandas. Like comprobacion_final, returns an empty list when
+        some row does not have one cell per column.
+        """
+        columns, tabla = ExtractTables.extraer_filas(documento_txt, nombre_seccion)
+        if any(len(fila) != len(columns) for fila in tabla):
+            return []
+        return [dict(zip(columns, fila)) for fila in tabla]
+
+    @staticmethod
+    def extraer_filas(documento_txt, nombre_seccion):
+        """
+        Extracts the rows of the table of a section.
+
+        Parameters:
+        documento_txt (str | SectionIndex): The document text, or its SectionIndex
+            when several sections are read from the same document.
+        nombre_seccion (str): One of the sections in ExtractTables.ESQUEMAS.
+
+        Returns:
+        tuple: (columns, rows), each row a list of cells. Both are empty for an
+        unknown section.
+        """
+        esquema = ExtractTables.ESQUEMAS.get(nombre_seccion)
+        if esquema is None:
+            return [], []
+
+        if isinstance(documento_txt, SectionIndex):
+            indice = documento_txt
+        else:
+            indice = SectionIndex(documento_txt)
+
+        tabla = [ExtractTables.construir_fila(renglon, esquema)
+                 for renglon in indice.filas(nombre_seccion)
+                 if not renglon.startswith(esquema.encabezado)]
+        return list(esquema.columnas), tabla
+
+    @staticmethod
+    def construir_fila(renglon, esquema):
+        """
+        Splits a table row into its cells following the section's EsquemaTabla.
+        A row with fewer cells than the schema needs is returned as is, so the
+        table fails the column count check instead of raising.
+        """
+        fecha = renglon[:16]
+        celdas = renglon.replace(fecha + " ", '').split('   ')
+        del celdas[-1]
+
+        fila = [fecha]
+        if esquema.fijas is None:
+            fila.extend(celdas)
+            return fila
+
+        fin = len(celdas) - 1 if esquema.final else len(celdas)
+        if fin < esquema.fijas:
+            fila.extend(celdas)
+            return fila
+
+        fila.extend(celdas[:esquema.fijas])
+        if esquema.medio:
+            fila.append("".join(celdas[esquema.fijas:fin]))
+        if esquema.final:
+            fila.append(celdas[-1])
+        return fila
+
+class SectionIndex:
+    """
+    Index of the table sections of a document, built once per document.
+
+    The text is split into lines and the header/footer noise is removed a single
+    time; then one scan maps every known section header to the line ranges of its
+    table and collects the table rows, so reading several sections does not
+    re-scan the whole document.
+    """
+    SECCIONES = tuple(ExtractTables.ESQUEMAS)
+
+    date_pattern = re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}")
+
+    def __init__(self, documento_txt):
+        self.texto = documento_txt
+        self.lineas = ExtractTables.eliminar_ruido(documento_txt.split('\n'))
+        self._filas, self.rangos = self.escanear(self.lineas, self.SECCIONES)
+
+    @staticmethod
+    def escanear(lineas, secciones):
+        """
+        Classifies each line in a single pass and returns the rows of every section.
+
+        Each line is one of:
+        - section start: starts with one of `secciones`; opens that section's table
+        - terminator: a single space; closes every open table
+        - row: starts with a "dd/mm/yyyy hh:mm" date; added to every open table
+        - continuation: anything else inside an open table. When another row follows,
+          the continuation text is merged into the last cell of the previous row
+          (wrapped cells); otherwise it is ignored, like the column header line.
+
+        Returns:
+        tuple: ({seccion: [rows]}, {seccion: [(inicio, fin) line ranges]})
+        """
+        inicio_seccion = re.compile("|".join(re.escape(seccion) for seccion in secciones)).match
+        es_fila = SectionIndex.date_pattern.match
+
+        filas = {seccion: [] for seccion in secciones}
+        rangos = {seccion: [] for seccion in secciones}
+        abiertas = {}  # seccion -> (línea de inicio, número de filas al abrir)
+        pendientes = []
+
+        for n, renglon in enumerate(lineas):
+            if abiertas:
+                if renglon == ' ':
+                    for seccion, (inicio, _) in abiertas.items():
+                        rangos[seccion].append((inicio, n))
+                    abiertas.clear()
+                    pendientes.clear()
+                    continue
+                if es_fila(renglon):
+                    for seccion, (_, desde) in abiertas.items():
+                        tabla = filas[seccion]
+                        if pendientes and len(tabla) > desde:
+                            tabla[-1] = SectionIndex.__unir(tabla[-1], pendientes)
+                        tabla.append(renglon)
+                    pendientes.clear()
+                    continue
+
+            if inicio_seccion(renglon):
+                for seccion in secciones:
+                    if seccion not in abiertas and renglon.startswith(seccion):
+                        abiertas[seccion] = (n + 1, len(filas[seccion]))
+            elif abiertas:
+                pendientes.append(renglon)
+
+        for seccion, (inicio, _) in abiertas.items():
+            rangos[seccion].append((inicio, len(lineas)))
+        return filas, rangos
+
+    @staticmethod
+    def __unir(fila, continuacion):
+        """Appends the continuation lines to the last cell of the row, keeping its trailing separator"""
+        base = fila.rstrip(' ')
+        texto = " ".join(" ".join(renglon.split()) for renglon in continuacion if renglon.strip())
+        if not texto:
+            return fila
+        return f"{base} {texto}{fila[len(base):]}"
+
+    def filas(self, seccion):
+        """Returns the date rows of the section's table"""
+        return self._filas.get(seccion, [])
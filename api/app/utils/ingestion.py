@@ -0,0 +1,197 @@
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from ..core.database import (
+    client,
+    documents_collection,
+    patients_collection,
+    vital_signs_collection,
+    dietetic_orders_collection,
+    prescriptions_collection,
+    notes_collection,
+    medication_entries_collection,
+    vital_measurements_collection
+)
+from ..core.indexes import PATIENT_HIM_FILTER
+from ..models.document import DocumentStatus
+from ..models.patient import PatientCreate, Patient, Gender
+from .document_processor import StructuredData
+from .medications import medication_entries, medication_keys
+from .note_search import note_sections
+from .storage import StoredFile
+from .vital_signs import measurement_writes
+
+def format_date(date: Optional[str], hour: Optional[str]) -> datetime:
+    if date and hour:
+        return datetime.strptime(f"{date} {hour}", "%d/%m/%Y %H:%M")
+    elif date:
+        return datetime.strptime(date, "%d/%m/%Y")
+    else:
+        return None
+
+def patient_record(patient_data: dict) -> dict:
+    """Patient fields taken from the header of the analyzed note, without doctors"""
+    gender_value = patient_data.get("Sexo", "").lower()
+    gender = Gender.MALE
+    if gender_value == "femenino" or gender_value == "f":
+        gender = Gender.FEMALE
+    elif gender_value != "masculino" and gender_value != "m":
+        gender = Gender.OTHER
+    
+    patient_create = PatientCreate(
+        names=patient_data.get("Nombres", ""),
+        paternal_lastname=patient_data.get("ApellidoPaterno", ""),
+        maternal_lastname=patient_data.get("ApellidoMaterno", ""),
+        date_of_birth=patient_data.get("FechaNacimiento", ""),
+        him=patient_data.get("HIM", None),
+        gender=gender
+    )
+    
+    patient = Patient(
+        **patient_create.dict(), 
+        created_at=datetime.utcnow(), 
+        updated_at=datetime.utcnow(),
+        doctors=[]
+    )
+    return patient.dict(exclude={"id", "doctors"})
+
+async def upsert_patient(patient_data: dict, doctor: dict) -> str:
+    """
+    Finds the patient by HIM or creates it, and adds the doctor who signed the note,
+    in one atomic operation. A note without HIM always creates a new patient.
+    """
+    record = patient_record(patient_data)
+    if not record.get("him"):
+        result = await patients_collection.insert_one({**record, "doctors": [doctor]})
+        return str(result.inserted_id)
+
+    for attempt in range(2):
+        try:
+            patient = await patients_collection.find_one_and_update(
+                # Con el filtro del índice parcial, para que MongoDB lo use
+                {"him": {"$eq": record["him"], **PATIENT_HIM_FILTER}},
+                {"$setOnInsert": record, "$addToSet": {"doctors": doctor}},
+                projection={"_id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return str(patient["_id"])
+        except DuplicateKeyError:
+            # Otra ingesta del mismo HIM creó el paciente al mismo tiempo; el reintento lo encuentra
+            if attempt:
+                raise
+
+async def analyze_document_background(extracted_data: StructuredData, document_id: str = None):
+    """
+    Stores an analyzed note in three round trips: the patient is upserted by HIM
+    together with the signing doctor, the note's vital sign measurements replace
+    their previous ones in the time-series collection, then the note, its vital
+    signs, dietetic orders, prescriptions and medication entries and the document
+    status go in one client bulk write (MongoDB 8.0+).
+
+    The note and its child records take the document's id when there is one, so a
+    retried ingestion job overwrites its own data instead of duplicating it.
+    """
+    patient_data = extracted_data.patient
+    doctor_data = extracted_data.doctor
+    note_data = extracted_data.note
+    vital_signs_data = extracted_data.vital_signs
+    dietetic_orders_data = extracted_data.dietetic_orders
+    prescriptions_data = extracted_data.prescriptions
+
+    now = datetime.utcnow()
+    note_id = ObjectId(document_id) if document_id else ObjectId()
+
+    doctor = {
+        "professional_certificate": doctor_data.get("CedulaProfesional", None),
+        "sign_date": format_date(doctor_data.get("FechaCreacion", None), doctor_data.get("HoraCreacion", None)),
+        "note_id": str(note_id)
+    }
+    patient_id = await upsert_patient(patient_data, doctor)
+
+    writes = [
+        ReplaceOne(
+            {"_id": note_id},
+            {"patient_id": patient_id, "created_at": now, **note_data, "Secciones": note_sections(extracted_data)},
+            upsert=True,
+            namespace=notes_collection.full_name
+        )
+    ]
+
+    entries = []
+    measurements = []
+    for collection, data in (
+        (vital_signs_collection, vital_signs_data),
+        (dietetic_orders_collection, dietetic_orders_data),
+        (prescriptions_collection, prescriptions_data)
+    ):
+        record = {"patient_id": patient_id, "note_id": str(note_id), "data": data.get("Tabla", []), "created_at": now}
+        if collection is prescriptions_collection:
+            # Para filtrar por medicamento desde el índice
+            record["medication_keys"] = medication_keys(record["data"])
+            entries = medication_entries(record)
+        elif collection is vital_signs_collection:
+            measurements = measurement_writes(record)
+        writes.append(ReplaceOne({"_id": note_id}, record, upsert=True, namespace=collection.full_name))
+
+    # Un reintento reemplaza las entradas de la nota en lugar de duplicarlas
+    writes.append(DeleteMany({"note_id": str(note_id)}, namespace=medication_entries_collection.full_name))
+    writes.extend(InsertOne(entry, namespace=medication_entries_collection.full_name) for entry in entries)
+
+    if document_id:
+        writes.append(UpdateOne(
+            {"_id": ObjectId(document_id)},
+            {"$set": {
+                **document_metadata(extracted_data),
+                "patient_id": patient_id,
+                "status": DocumentStatus.ANALYZED.value,
+                "updated_at": now
+            }},
+            namespace=documents_collection.full_name
+        ))
+
+    # La serie de tiempo va en su propio bulk_write, antes del estado del
+    # documento: una nota analizada ya tiene sus mediciones
+    await vital_measurements_collection.bulk_write(measurements)
+    await client.bulk_write(writes)
+
+    return patient_id
+
+def pending_document(stored: StoredFile, uploaded_by: str) -> dict:
+    """
+    Document record of a stored upload. The metadata is filled in by the ingestion
+    worker once the note is analyzed.
+    """
+    return {
+        "note_number": "N/A",
+        "note_type": "Documento Médico",
+        "file_path": stored.path,
+        "content_sha256": stored.sha256,
+        "file_size": stored.size,
+        "page_count": stored.pages,
+        "uploaded_by": uploaded_by,
+        "patient_id": None,  # Will be set after patient creation by the ingestion worker
+        "status": DocumentStatus.PENDING.value,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+
+def document_metadata(extracted_data: StructuredData) -> dict:
+    """Document fields taken from the header of the analyzed note"""
+    patient_data = extracted_data.patient if extracted_data.patient else {}
+    note_data = extracted_data.note if extracted_data.note else {}
+
+    return {
+        "note_number": note_data.get("NoNota") or "N/A",
+        "note_type": note_data.get("TipoNota") or "Documento Médico",
+        "record_number": note_data.get("NoExpediente", None),
+        "him": patient_data.get("HIM", None),
+        "hospital": note_data.get("Hospital", None),
+        "admission_date": note_data.get("FechaIngreso", None),
+        "admission_time": note_data.get("HoraIngreso", None),
+        "discharge_time": note_data.get("HoraAlta", None),
+    }
@@ -0,0 +1,143 @@
+"""
+Durable queue of document ingestion jobs, stored in the ingestion_jobs collection.
+
+queued -> running -> succeeded
+            |
+            +-> queued (retry after a backoff) ... -> dead (document FAILED)
+
+A worker claims a job atomically with find_one_and_update and holds it until
+lease_expires_at, renewing the lease with a heartbeat while it works. If the
+worker dies, the lease expires and any other worker, on any host, can claim the
+job again; that also counts as an attempt.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+from ..core.config import get_settings
+from ..core.database import documents_collection, ingestion_jobs_collection
+from ..models.document import DocumentStatus
+from ..models.ingestion_job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+def _new_job(document_id: str, file_path: str, now: datetime) -> dict:
+    return {
+        "document_id": document_id,
+        "file_path": file_path,
+        "status": JobStatus.QUEUED.value,
+        "attempts": 0,
+        "max_attempts": get_settings().ingestion_max_attempts,
+        "available_at": now,
+        "lease_expires_at": None,
+        "worker_id": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+
+async def enqueue_job(document_id: str, file_path: str) -> str:
+    """Queues the ingestion of a stored document and returns the job id"""
+    result = await ingestion_jobs_collection.insert_one(_new_job(document_id, file_path, datetime.utcnow()))
+    return str(result.inserted_id)
+
+async def enqueue_jobs(documents: List[Tuple[str, str]]) -> List[str]:
+    """Queues several (document_id, file_path) in one insert and returns their job ids in order"""
+    now = datetime.utcnow()
+    result = await ingestion_jobs_collection.insert_many([_new_job(document_id, file_path, now) for document_id, file_path in documents])
+    return [str(job_id) for job_id in result.inserted_ids]
+
+async def claim_job(worker_id: str) -> Optional[dict]:
+    """
+    Atomically takes the oldest available job (queued and due, or running with an
+    expired lease) and leases it to the worker. Returns None if there is none.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=get_settings().ingestion_lease_seconds)
+    return await ingestion_jobs_collection.find_one_and_update(
+        {"$or": [
+            {"status": JobStatus.QUEUED.value, "available_at": {"$lte": now}},
+            # El worker que lo tenía murió o dejó de responder
+            {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": JobStatus.RUNNING.value,
+                "worker_id": worker_id,
+                "lease_expires_at": now + lease,
+                "heartbeat_at": now,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("available_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def _owned(job: dict) -> dict:
+    """Filter that only matches the job while this worker still holds its lease"""
+    return {"_id": job["_id"], "status": JobStatus.RUNNING.value, "worker_id": job["worker_id"]}
+
+async def renew_lease(job: dict) -> bool:
+    """Heartbeat: extends the lease of a job being processed. Returns False if it was lost"""
+    now = datetime.utcnow()
+    lease = timedelta(seconds=get_settings().ingestion_lease_seconds)
+    result = await ingestion_jobs_collection.update_one(
+        _owned(job),
+        {"$set": {"lease_expires_at": now + lease, "heartbeat_at": now}}
+    )
+    return result.modified_count == 1
+
+async def complete_job(job: dict) -> bool:
+    """Marks a claimed job as succeeded. Returns False if the lease was lost meanwhile"""
+    result = await ingestion_jobs_collection.update_one(
+        _owned(job),
+        {"$set": {
+            "status": JobStatus.SUCCEEDED.value,
+            "lease_expires_at": None,
+            "last_error": None,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+    if result.modified_count == 0:
+        logger.warning(f"Job {job['_id']} was reclaimed by another worker before it completed")
+    return result.modified_count == 1
+
+async def fail_job(job: dict, error: str) -> JobStatus:
+    """
+    Records a failed attempt. The job is queued again after an exponential backoff,
+    or dead-lettered (and its document marked FAILED) once it runs out of attempts.
+    """
+    settings = get_settings()
+    now = datetime.utcnow()
+
+    if job["attempts"] >= job["max_attempts"]:
+        status = JobStatus.DEAD
+        update = {"status": status.value, "lease_expires_at": None}
+    else:
+        status = JobStatus.QUEUED
+        backoff = settings.ingestion_retry_backoff_seconds * 2 ** (job["attempts"] - 1)
+        update = {"status": status.value, "lease_expires_at": None, "available_at": now + timedelta(seconds=backoff)}
+
+    result = await ingestion_jobs_collection.update_one(
+        _owned(job),
+        {"$set": {**update, "last_error": error, "updated_at": now}}
+    )
+    if result.modified_count == 0:
+        logger.warning(f"Job {job['_id']} was reclaimed by another worker before it failed")
+        return JobStatus.RUNNING
+
+    if status == JobStatus.DEAD:
+        logger.error(f"Job {job['_id']} dead after {job['attempts']} attempts: {error}")
+        await documents_collection.update_one(
+            {"_id": ObjectId(job["document_id"])},
+            {"$set": {"status": DocumentStatus.FAILED.value, "error_message": error, "updated_at": now}}
+        )
+    return status
+
+async def get_job(job_id: str) -> Optional[dict]:
+    return await ingestion_jobs_collection.find_one({"_id": ObjectId(job_id)})
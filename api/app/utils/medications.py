@@ -0,0 +1,104 @@
+"""
+Normalized medication names, so the prescriptions can be filtered by medication
+in the database from an index instead of matching every `data[].Medicamento`.
+
+The key of a name is accent-folded, lowercased and cut before the dose, e.g.
+"ENOXAPARINA 40 MG/0.4 ML SOL INY" -> "enoxaparina". Each prescription record
+stores in `medication_keys` the keys of its medications starting at every word
+("acido acetilsalicilico" and "acetilsalicilico"), so a prefix of any word of
+the name finds it.
+
+For the search across patients every row of a prescriptions table is also a
+document of medication_entries. Its _id is an ObjectId whose timestamp is the
+row's Inicio, so the (key, _id) index filters by medication and orders by start
+date at once.
+"""
+
+import os
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from bson import ObjectId
+
+_SEPARATORS = re.compile(r"[^a-z0-9.%]+")
+
+def medication_key(name: str) -> str:
+    """Accent-folded, lowercased name without the dose and presentation"""
+    folded = unicodedata.normalize("NFKD", name or "")
+    folded = "".join(c for c in folded if not unicodedata.combining(c)).lower()
+    words = [word for word in _SEPARATORS.split(folded) if word.strip(".%")]
+
+    # La dosis empieza en la primera palabra con número: "500 mg tab", "1 g amp"
+    for i, word in enumerate(words):
+        if i and word[0].isdigit():
+            words = words[:i]
+            break
+    return " ".join(words)
+
+def medication_keys(data: Iterable[dict]) -> List[str]:
+    """Keys of the medications of a prescriptions table, from every word on"""
+    keys = set()
+    for row in data or []:
+        words = medication_key(row.get("Medicamento") or "").split()
+        keys.update(" ".join(words[i:]) for i in range(len(words)))
+    return sorted(keys)
+
+def medication_filter(name: str) -> dict:
+    """
+    Filter of the prescriptions with a medication whose name (from any word)
+    starts with `name`. The regex is anchored and case-sensitive, so MongoDB reads
+    it as a range of the medication_keys index.
+    """
+    return {"medication_keys": {"$regex": f"^{re.escape(medication_key(name))}"}}
+
+def parse_inicio(value: Optional[str]) -> Optional[datetime]:
+    """Inicio of a prescriptions row ("dd/mm/yyyy HH:MM"), None if it cannot be read"""
+    for date_format in ("%d/%m/%Y %H:%M", "%d/%m/%Y"):
+        try:
+            return datetime.strptime((value or "").strip(), date_format)
+        except ValueError:
+            continue
+    return None
+
+# Fechas que caben en el timestamp de un ObjectId (segundos desde 1970, 32 bits)
+ENTRY_ID_MIN = datetime(1970, 1, 1)
+ENTRY_ID_MAX = datetime(2106, 2, 7, 6, 28, 15)
+
+def clamp_entry_date(date: datetime) -> datetime:
+    """
+    date in UTC limited to the range of an ObjectId timestamp. Every entry starts
+    inside it, so a bound of the search clamped to it selects the same entries.
+    """
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(max(date, ENTRY_ID_MIN), ENTRY_ID_MAX)
+
+def entry_id(inicio: datetime) -> ObjectId:
+    """Unique ObjectId whose timestamp is inicio, to the second"""
+    return ObjectId(ObjectId.from_datetime(inicio).binary[:4] + os.urandom(8))
+
+def medication_entries(prescription: dict) -> List[dict]:
+    """
+    One medication_entries document per row of a prescriptions record. A row
+    without a readable Inicio takes the date of the record.
+    """
+    entries = []
+    for row in prescription.get("data") or []:
+        key = medication_key(row.get("Medicamento") or "")
+        if not key:
+            continue
+        inicio = parse_inicio(row.get("Inicio"))
+        # El timestamp de un ObjectId va de 1970 a 2106
+        if inicio is None or not ENTRY_ID_MIN <= inicio <= ENTRY_ID_MAX:
+            inicio = prescription["created_at"]
+        entries.append({
+            "_id": entry_id(inicio),
+            "key": key,
+            "medication": row.get("Medicamento"),
+            "inicio": inicio,
+            "patient_id": prescription["patient_id"],
+            "note_id": prescription["note_id"],
+        })
+    return entries
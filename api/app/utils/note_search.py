@@ -0,0 +1,73 @@
+"""
+Free-text sections of the notes and their full-text search.
+
+The sections (Subjetivo, Examen Físico, Notas, Análisis/Condición, Comentar
+estudio(s) and Plan de Tratamiento) are stored with the note under `Secciones`
+and indexed by a MongoDB text index in Spanish, which stems the words and ignores
+case and accents. MongoDB ranks the hits (textScore); the snippets are cut here
+from the sections of the notes of the page.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+# Clave en `Secciones` -> (parte de StructuredData, campo, encabezado en la nota)
+SECTIONS = {
+    "Subjetivo": ("vital_signs", "Subjetivo", "Subjetivo"),
+    "ExamenFisico": ("active_diagnostics", "ExamenFisico", "Examen Físico"),
+    "Notas": ("active_diagnostics", "Notas", "Notas"),
+    "AnalisisCondicion": ("active_diagnostics", "AnalisisCondicion", "Análisis/Condición"),
+    "Estudios": ("active_diagnostics", "Estudios", "Comentar estudio(s)"),
+    "PlanTratamiento": ("active_diagnostics", "PlanTratamiento", "Plan de Tratamiento"),
+}
+
+TEXT_FIELDS = [f"Secciones.{key}" for key in SECTIONS]
+
+_WORD = re.compile(r"\w+")
+
+def note_sections(extracted_data) -> Dict[str, str]:
+    """Text of each section of an analyzed note, without its heading"""
+    sections = {}
+    for key, (part, field, heading) in SECTIONS.items():
+        text = ((getattr(extracted_data, part, None) or {}).get(field) or "").strip()
+        first_line, _, rest = text.partition("\n")
+        if first_line.strip() == heading:
+            text = rest.strip()
+        if text:
+            sections[key] = text
+    return sections
+
+def _fold(text: str) -> str:
+    """Lowercased text without accents, with the same length as text"""
+    return "".join(unicodedata.normalize("NFKD", c)[0].lower() if c.strip() else c for c in text)
+
+def _stems(query: str) -> List[str]:
+    """Approximate stems of the query words, to find them in the sections"""
+    words = _WORD.findall(_fold(query))
+    words = [word for word in words if len(word) >= 3] or words
+    # Sin el stemmer de MongoDB: se recorta la terminación ("dolores" -> "dolor")
+    return [word[:max(4, len(word) - 2)] for word in words]
+
+def snippets(sections: Optional[Dict[str, str]], query: str, max_snippets: int = 3, width: int = 160) -> List[dict]:
+    """
+    Fragments of the sections around the first word of the query found in each,
+    up to max_snippets, the sections with more matches first
+    """
+    stems = _stems(query)
+    if not sections or not stems:
+        return []
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(stem) for stem in stems) + r")\w*")
+
+    found = []
+    for key, text in sections.items():
+        matches = list(pattern.finditer(_fold(text)))
+        if not matches:
+            continue
+        start = max(0, matches[0].start() - width // 3)
+        end = min(len(text), start + width)
+        fragment = " ".join(text[start:end].split())
+        found.append((len(matches), key, ("…" if start else "") + fragment + ("…" if end < len(text) else "")))
+
+    found.sort(key=lambda match: -match[0])
+    return [{"section": key, "text": fragment} for _, key, fragment in found[:max_snippets]]
@@ -0,0 +1,89 @@
+"""
+Keyset pagination of the list endpoints on (created_at, _id), newest first.
+
+A page is read with find(...).sort(created_at desc, _id desc).limit(limit + 1)
+starting after the last record of the previous page, so its cost does not grow
+with the collection the way skip/offset or reading everything does. The body
+stays a plain list; the token of the next page goes in the X-Next-Cursor
+header (absent on the last page) and, with include_total=true, the number of
+matching records in X-Total-Count.
+
+Records without created_at (users and roles created before it was stored) sort
+after all the others, ordered by _id.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query, Response, status
+from pymongo import DESCENDING
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+@dataclass
+class Page:
+    after: Optional[dict]
+    limit: int
+    include_total: bool
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque token that resumes a listing after this record"""
+    created_at = doc.get("created_at")
+    key = {"t": created_at.isoformat() if isinstance(created_at, datetime) else None, "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> dict:
+    """Filter of the records that come after the cursor in SORT order"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        last_id = ObjectId(key["id"])
+        created_at = datetime.fromisoformat(key["t"]) if key["t"] is not None else None
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    if created_at is None:
+        return {"created_at": None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": last_id}},
+        # Los registros sin created_at van al final
+        {"created_at": None}
+    ]}
+
+def page_params(
+    cursor: Optional[str] = Query(None, description=f"Token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    include_total: bool = Query(False, description=f"Count the matching records in the {TOTAL_COUNT_HEADER} header")
+) -> Page:
+    """Pagination query parameters of a list endpoint"""
+    return Page(after=decode_cursor(cursor) if cursor else None, limit=limit, include_total=include_total)
+
+async def paginate(collection, query: dict, page: Page, response: Response, projection: Optional[dict] = None) -> List[dict]:
+    """One page of the records matching query, setting the pagination headers on response"""
+    page_query = {"$and": [query, page.after]} if page.after else query
+    if projection and any(projection.values()):
+        # El cursor de la página siguiente necesita created_at
+        projection = {**projection, "created_at": 1}
+    docs = await collection.find(page_query, projection).sort(SORT).limit(page.limit + 1).to_list()
+
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1])
+    if page.include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(await collection.count_documents(query))
+
+    return docs
@@ -0,0 +1,61 @@
+"""
+Field selection for list endpoints. `?fields=a,b` and `?view=summary` become a
+MongoDB projection, so the fields left out (the `data` tables of the clinical
+records, the `extracted_data` of documents) are neither read from the database
+nor serialized.
+
+Field names are the ones of the response, which are also the stored keys. The
+required fields of the response model and the id are always included.
+"""
+
+from enum import Enum
+from typing import Iterable, List, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+class View(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+def _output_name(name: str, field) -> str:
+    return field.alias or name
+
+def field_selection(model: Type[BaseModel], summary: Iterable[str]):
+    """
+    Dependency returning the projection requested for a list of `model`, or None
+    for the full records
+    """
+    names = {_output_name(name, field) for name, field in model.model_fields.items()}
+    required = {_output_name(name, field) for name, field in model.model_fields.items() if field.is_required()}
+    summary = set(summary)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+        view: View = Query(View.FULL, description="summary leaves out the bulky fields")
+    ) -> Optional[dict]:
+        if fields is None and view == View.FULL:
+            return None
+
+        selected = set(summary) if view == View.SUMMARY else set()
+        if fields:
+            requested = {name.strip() for name in fields.split(",") if name.strip()}
+            if unknown := requested - names:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+                )
+            selected |= requested
+
+        # _id se incluye siempre
+        return {name: 1 for name in sorted(selected | required) if name != "id"}
+
+    return dependency
+
+def projected_response(items: List[dict], model: Type[BaseModel]) -> JSONResponse:
+    """Items read with a projection, serialized with only the fields that were read"""
+    return JSONResponse([
+        model.model_validate(item).model_dump(mode="json", by_alias=True, exclude_unset=True)
+        for item in items
+    ])
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from io import BytesIO
+from typing import BinaryIO, NamedTuple, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PyPDF2 import PdfReader
+
+from ..core.config import get_settings
+
+CHUNK_SIZE = 1024 * 1024
+
+class UploadRejected(Exception):
+    """The upload is not a valid PDF or breaks a limit; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class StoredFile(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    pages: int
+
+def _safe_name(filename: Optional[str]) -> str:
+    """Last component of the client's file name, without characters unsafe in a path"""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    name = re.sub(r"[^\w.\- ]", "_", name)[:100]
+    return name or "document.pdf"
+
+def _count_pages(pdf) -> int:
+    try:
+        return len(PdfReader(pdf).pages)
+    except Exception as e:
+        raise UploadRejected(f"Invalid PDF file: {str(e)}")
+
+def store_file(source: BinaryIO, filename: Optional[str], upload_dir: str) -> StoredFile:
+    """
+    Copies a PDF from a file-like object to `upload_dir` in chunks, hashing it as it
+    is written, so it is never held in memory as a whole.
+
+    The file is written to a temporary name and only renamed to its final,
+    collision-free name once it passed every check (UPLOAD_MAX_BYTES and
+    UPLOAD_MAX_PAGES), so a partial or rejected upload never shows up there.
+    Raises UploadRejected otherwise.
+
+    This is blocking; from async code use store_upload.
+    """
+    settings = get_settings()
+    os.makedirs(upload_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(CHUNK_SIZE):
+                if size == 0 and not chunk.startswith(b"%PDF-"):
+                    raise UploadRejected("Not a PDF file", 415)
+                size += len(chunk)
+                if size > settings.upload_max_bytes:
+                    raise UploadRejected(f"File exceeds the maximum size of {settings.upload_max_bytes} bytes", 413)
+                digest.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            raise UploadRejected("Empty file")
+
+        pages = _count_pages(tmp_path)
+        if pages > settings.upload_max_pages:
+            raise UploadRejected(f"File exceeds the maximum of {settings.upload_max_pages} pages", 413)
+
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        file_path = os.path.join(upload_dir, f"{timestamp}_{uuid4().hex}_{_safe_name(filename)}")
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return StoredFile(file_path, digest.hexdigest(), size, pages)
+
+def read_pdf(source: BinaryIO) -> bytes:
+    """
+    Reads a PDF from a file-like object into memory with the same checks as
+    store_file, for analysis that does not keep the file. Raises UploadRejected.
+    """
+    settings = get_settings()
+    data = source.read(settings.upload_max_bytes + 1)
+
+    if not data:
+        raise UploadRejected("Empty file")
+    if not data.startswith(b"%PDF-"):
+        raise UploadRejected("Not a PDF file", 415)
+    if len(data) > settings.upload_max_bytes:
+        raise UploadRejected(f"File exceeds the maximum size of {settings.upload_max_bytes} bytes", 413)
+    if _count_pages(BytesIO(data)) > settings.upload_max_pages:
+        raise UploadRejected(f"File exceeds the maximum of {settings.upload_max_pages} pages", 413)
+
+    return data
+
+async def read_upload(file: UploadFile) -> bytes:
+    """read_pdf for an uploaded file, run in a worker thread so it does not block the event loop"""
+    await file.seek(0)
+    return await run_in_threadpool(read_pdf, file.file)
+
+async def store_upload(file: UploadFile, upload_dir: str) -> StoredFile:
+    """store_file for an uploaded file, run in a worker thread so it does not block the event loop"""
+    await file.seek(0)
+    return await run_in_threadpool(store_file, file.file, file.filename, upload_dir)
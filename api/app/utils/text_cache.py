@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional
+
+import PyPDF2
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Cambiar el sufijo cuando cambie la forma de extraer el texto, para invalidar el caché
+EXTRACTOR_VERSION = f"pypdf2-{PyPDF2.__version__}-1"
+
+class TextCache:
+    """
+    Content-addressed cache of the text extracted from PDF files.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus EXTRACTOR_VERSION and
+    live in two tiers:
+    1. An in-memory hot tier (LRU, bounded by `memory_bytes`)
+    2. An on-disk tier under `directory` (LRU by last access, bounded by `disk_bytes`)
+    """
+
+    def __init__(self, directory: str, disk_bytes: int, memory_bytes: int):
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.memory_bytes = memory_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_disk_index()
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """Returns the cache key of the given PDF bytes"""
+        return f"{hashlib.sha256(data).hexdigest()}.{EXTRACTOR_VERSION}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def _load_disk_index(self):
+        """Rebuilds the disk LRU order from the files' modification times"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".txt"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(".txt")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+        self._evict_disk()
+
+    def _remember(self, key: str, text: str):
+        """Stores the text in the memory tier, evicting the least recently used entries"""
+        # Bytes del str en memoria, no caracteres: su encabezado y hasta 4 bytes por
+        # carácter si trae alguno fuera de latin-1 (viñetas, guiones largos)
+        size = sys.getsizeof(text)
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= sys.getsizeof(self._memory.pop(key))
+        self._memory[key] = text
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= sys.getsizeof(evicted)
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached text for the key, or None on a miss"""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                if key in self._disk:
+                    self._disk_size -= self._disk.pop(key)
+                self.misses += 1
+                return None
+
+            if key not in self._disk:
+                # Escrito por otro proceso que comparte el directorio
+                self._disk[key] = os.path.getsize(path)
+                self._disk_size += self._disk[key]
+            self._disk.move_to_end(key)
+            self.disk_hits += 1
+            self._remember(key, text)
+            return text
+
+    def put(self, key: str, text: str):
+        """Stores the text in both tiers"""
+        data = text.encode("utf-8")
+        with self._lock:
+            self._remember(key, text)
+            if len(data) > self.disk_bytes:
+                return
+            try:
+                # Escritura atómica: otro proceso nunca ve un archivo a medias
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                logger.warning(f"Could not write text cache entry {key}: {e}")
+                return
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters and the size of each tier"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+@lru_cache()
+def get_text_cache() -> Optional[TextCache]:
+    """Returns the process-wide text cache, or None if it is disabled"""
+    settings = get_settings()
+    if not settings.text_cache_enabled:
+        return None
+    return TextCache(
+        directory=settings.text_cache_dir,
+        disk_bytes=settings.text_cache_disk_bytes,
+        memory_bytes=settings.text_cache_memory_bytes,
+    )
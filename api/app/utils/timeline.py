@@ -0,0 +1,61 @@
+"""
+Patient timeline: a page of the patient's notes (newest first) and, for each note,
+its vital signs, prescriptions, dietetic orders and document, read with one
+aggregation over the notes collection.
+
+The notes are read from the (patient_id, created_at, _id) index in the order of
+utils.pagination, so a page starts where the cursor of the previous one left off.
+Each note is its own result document: a page is not nested in the patient, which
+would hold it to the 16 MB limit of one document. The ingestion stores one vital
+signs, prescriptions and dietetic orders record per note, joined by note_id,
+whose `data` table goes in the note; the document is joined by _id.
+"""
+
+from typing import List, Optional
+
+from .pagination import SORT
+
+def _data_table(field: str) -> dict:
+    """The `data` table of the record joined into field, [] if the note has none"""
+    return {"$ifNull": [{"$arrayElemAt": [f"${field}.data", 0]}, []]}
+
+def notes_filter(patient_id: str, created_at: Optional[dict] = None) -> dict:
+    """The patient's notes, created in the range if there is one"""
+    query = {"patient_id": patient_id}
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+def timeline_pipeline(
+    patient_id: str,
+    created_at: Optional[dict] = None,
+    after: Optional[dict] = None,
+    limit: int = 100
+) -> List[dict]:
+    """Pipeline over notes returning up to limit + 1 notes, to know whether there is a next page"""
+    query = notes_filter(patient_id, created_at)
+
+    return [
+        {"$match": {"$and": [query, after]} if after else query},
+        {"$sort": dict(SORT)},
+        {"$limit": limit + 1},
+        {"$addFields": {"note_id": {"$toString": "$_id"}}},
+        {"$lookup": {"from": "vital_signs", "localField": "note_id", "foreignField": "note_id", "as": "vital_signs"}},
+        {"$lookup": {"from": "prescriptions", "localField": "note_id", "foreignField": "note_id", "as": "prescriptions"}},
+        {"$lookup": {"from": "dietetic_orders", "localField": "note_id", "foreignField": "note_id", "as": "dietetic_orders"}},
+        # Desde la ingesta por trabajos la nota tiene el _id de su documento
+        {"$lookup": {
+            "from": "documents",
+            "localField": "_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"extracted_data": 0}}],
+            "as": "document"
+        }},
+        {"$addFields": {
+            "vital_signs": _data_table("vital_signs"),
+            "prescriptions": _data_table("prescriptions"),
+            "dietetic_orders": _data_table("dietetic_orders"),
+            "document": {"$arrayElemAt": ["$document", 0]}
+        }},
+        {"$project": {"note_id": 0}}
+    ]
@@ -0,0 +1,156 @@
+"""
+Vital signs as typed measurements, so a patient's series over a time range is
+read from an index instead of loading every note and parsing its table.
+
+Each row of a vital signs table becomes a document of vital_measurements, a
+MongoDB time-series collection: `t` is the row's Fecha/Hora, `meta.patient_id`
+the patient (MongoDB groups the measurements of a patient in buckets) and each
+measure a number. The table of a note covers the last 24 hours, so consecutive
+notes repeat rows; a patient keeps one measurement per Fecha/Hora, the one of
+the last note ingested.
+
+A trend is computed in two steps: MongoDB groups the measurements of a time
+window by interval ($dateTrunc) into min, max, mean and last, and the series of
+each measure is then cut to a number of points with LTTB (largest triangle three
+buckets), which keeps the peaks and the shape a chart needs.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from pymongo import DeleteMany, InsertOne
+
+# Medida -> columna de la tabla de signos vitales (DocumentProcessor.signos_vitales_lst)
+MEASURES = {
+    "fr": "FR",
+    "fc": "FC",
+    "pas": "PAS",
+    "pad": "PAD",
+    "sat_o2": "SAT_O2",
+    "temp_c": "Temp_°C",
+    "peso": "Peso",
+    "talla": "Talla",
+}
+
+_NUMBER = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+def parse_fecha_hora(value: Optional[str]) -> Optional[datetime]:
+    """Fecha/Hora of a vital signs row ("dd/mm/yyyy HH:MM"), None if it cannot be read"""
+    try:
+        return datetime.strptime((value or "").strip(), "%d/%m/%Y %H:%M")
+    except ValueError:
+        return None
+
+def parse_measure(value: Optional[str]) -> Optional[float]:
+    """First number of a cell ("36,5", "70 kg"), None if it has none"""
+    match = _NUMBER.search(value or "")
+    return float(match.group().replace(",", ".")) if match else None
+
+def vital_measurements(vital_signs: dict) -> List[dict]:
+    """
+    One vital_measurements document per row of a vital signs record. Rows without
+    a readable Fecha/Hora or without any number are left out.
+    """
+    measurements = {}
+    for row in vital_signs.get("data") or []:
+        t = parse_fecha_hora(row.get("Fecha/Hora"))
+        if t is None:
+            continue
+        values = {measure: parse_measure(row.get(column)) for measure, column in MEASURES.items()}
+        values = {measure: value for measure, value in values.items() if value is not None}
+        if values:
+            # Una medición por Fecha/Hora, también dentro de la misma tabla
+            measurements[t] = {"t": t, "meta": {"patient_id": vital_signs["patient_id"]},
+                               "note_id": vital_signs["note_id"], **values}
+    return list(measurements.values())
+
+def measurement_writes(vital_signs: dict) -> list:
+    """
+    Ordered bulk write that replaces the measurements of a note, and the patient's
+    ones at the same times taken from earlier notes, with the note's rows. Running
+    it again leaves the same measurements.
+    """
+    measurements = vital_measurements(vital_signs)
+    writes = [DeleteMany({
+        "meta.patient_id": vital_signs["patient_id"],
+        "$or": [{"note_id": vital_signs["note_id"]}, {"t": {"$in": [m["t"] for m in measurements]}}]
+    })]
+    writes.extend(InsertOne(measurement) for measurement in measurements)
+    return writes
+
+# Unidad de $dateTrunc de cada sufijo de ?interval= ("15m", "1h", "1d")
+INTERVAL_UNITS = {"m": "minute", "h": "hour", "d": "day"}
+
+def trend_pipeline(patient_id: str, measures: List[str], interval: str, time_filter: Optional[dict] = None) -> List[dict]:
+    """
+    Aggregation of the measurements of a patient into one document per interval,
+    oldest first, with <measure>_min, _max, _mean and _last of each measure
+    """
+    match = {"meta.patient_id": patient_id}
+    if time_filter:
+        match["t"] = time_filter
+
+    group = {"_id": {"$dateTrunc": {"date": "$t", "unit": INTERVAL_UNITS[interval[-1]], "binSize": int(interval[:-1])}}}
+    last = {}
+    for measure in measures:
+        group[f"{measure}_min"] = {"$min": f"${measure}"}
+        group[f"{measure}_max"] = {"$max": f"${measure}"}
+        group[f"{measure}_mean"] = {"$avg": f"${measure}"}
+        # El último valor presente: el máximo de (t, valor), sin los renglones que no traen la medida
+        group[f"{measure}_last"] = {"$max": {"$cond": [{"$isNumber": f"${measure}"}, {"t": "$t", "v": f"${measure}"}, None]}}
+        last[f"{measure}_last"] = f"${measure}_last.v"
+
+    return [
+        {"$match": match},
+        {"$group": group},
+        {"$addFields": last},
+        {"$sort": {"_id": 1}},
+    ]
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the threshold points of (x, y) that keep the shape of the series
+    (largest triangle three buckets); the first and the last point always stay.
+    x must be increasing and threshold at least 3.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+
+    # threshold - 2 buckets entre el primer y el último punto
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Tercer vértice: el promedio del bucket siguiente (el último punto al final)
+        following = slice(end, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        avg_x, avg_y = x[following].mean(), y[following].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def trend_series(buckets: List[dict], measures: List[str], points: int) -> Dict[str, List[dict]]:
+    """
+    Series of each measure from the documents of trend_pipeline, without the
+    intervals where it is missing, cut to at most points with lttb on the mean
+    """
+    times = np.array([bucket["_id"] for bucket in buckets], dtype="datetime64[ms]")
+    series = {}
+    for measure in measures:
+        stats = np.array(
+            [[bucket.get(f"{measure}_{stat}") for stat in ("min", "max", "mean", "last")] for bucket in buckets],
+            dtype=float
+        ).reshape(-1, 4)
+        present = ~np.isnan(stats[:, 2])
+        t, stats = times[present], stats[present]
+        keep = lttb(t.astype(np.int64).astype(float), stats[:, 2], points)
+        series[measure] = [
+            {"t": time, "min": row[0], "max": row[1], "mean": row[2], "last": row[3]}
+            for time, row in zip(t[keep].tolist(), stats[keep].tolist())
+        ]
+    return series
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from contextlib import suppress
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+from .core.config import get_settings
+from .core.database import close_db, connect_db, documents_collection
+from .core.indexes import ensure_indexes
+from .models.document import DocumentStatus
+from .utils.document_processor import DocumentProcessor
+from .utils.ingestion import analyze_document_background
+from .utils import job_queue
+
+logger = logging.getLogger(__name__)
+
+class LeaseHeartbeat:
+    """
+    Renews the lease of the job being processed every `interval` seconds.
+
+    It runs as a task of the worker's event loop; the analysis itself runs in a
+    thread (it is CPU-bound) so the loop stays free to send the heartbeat in time.
+    """
+
+    def __init__(self, job: dict, interval: float):
+        self.job = job
+        self.interval = interval
+        self.lost = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not await job_queue.renew_lease(self.job):
+                self.lost = True
+                logger.warning(f"Lost the lease of job {self.job['_id']}")
+                return
+
+    async def stop(self):
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+async def process_job(job: dict):
+    """Analyzes the document of a claimed job and stores its data"""
+    document_id = job["document_id"]
+
+    if job["attempts"] > job["max_attempts"]:
+        # Tomado de nuevo tras vencer su lease, ya sin intentos
+        await job_queue.fail_job(job, job.get("last_error") or "Lease expired on every attempt")
+        return
+
+    await documents_collection.update_one(
+        {"_id": ObjectId(document_id)},
+        {"$set": {"status": DocumentStatus.PROCESSING.value, "updated_at": datetime.utcnow()}}
+    )
+
+    heartbeat = LeaseHeartbeat(job, get_settings().ingestion_heartbeat_seconds)
+    heartbeat.start()
+    try:
+        if not os.path.exists(job["file_path"]):
+            raise FileNotFoundError(f"Document file not found: {job['file_path']}")
+
+        document_processor = DocumentProcessor(job["file_path"])
+        extracted_data = await asyncio.to_thread(document_processor.analyze_blocking)
+
+        if heartbeat.lost:
+            # Otro worker ya tomó el trabajo; no guardar los datos dos veces
+            return
+
+        await analyze_document_background(extracted_data, document_id)
+    except Exception as e:
+        logger.exception(f"Job {job['_id']} failed on attempt {job['attempts']}")
+        await job_queue.fail_job(job, str(e))
+        return
+    finally:
+        await heartbeat.stop()
+
+    await job_queue.complete_job(job)
+
+async def run_worker(worker_id: str, stop: asyncio.Event, drain: bool = False):
+    """
+    Claims and processes jobs one at a time until `stop` is set.
+    With drain=True it also returns as soon as there is no job to claim.
+    """
+    poll_seconds = get_settings().ingestion_poll_seconds
+    logger.info(f"Ingestion worker {worker_id} started")
+
+    processed = 0
+    while not stop.is_set():
+        job = await job_queue.claim_job(worker_id)
+        if job is None:
+            if drain:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await process_job(job)
+        processed += 1
+
+    logger.info(f"Ingestion worker {worker_id} stopped after {processed} jobs")
+    return processed
+
+def worker_id() -> str:
+    """Identity of this worker process in the jobs it claims"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def _main(drain: bool = False):
+    await connect_db()
+    await ensure_indexes()
+
+    # SIGTERM/SIGINT: terminar el trabajo en curso y salir
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        return await run_worker(worker_id(), stop, drain)
+    finally:
+        await close_db()
+
+def _run_process(drain: bool):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(_main(drain))
+
+def run_processes(processes: int, drain: bool = False):
+    """Runs `processes` independent workers and waits for all of them"""
+    # spawn: cada worker abre su propia conexión a Mongo en lugar de heredarla
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_run_process, args=(drain,)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    def forward(signum, frame):
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for worker in workers:
+        worker.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Document ingestion worker")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to run on this host")
+    parser.add_argument("--drain", action="store_true", help="exit once there are no jobs left")
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        run_processes(args.processes, args.drain)
+    else:
+        _run_process(args.drain)
@@ -0,0 +1,112 @@
+"""
+Synthetic medical notes for the benchmarks.
+
+The generated text follows the layout the parsers in app.utils.helpers expect:
+a header block per page (from "Expediente:" to "Derechos de Autor"), section
+headers followed by date-prefixed rows whose cells are separated by three
+spaces, and a single-space line closing each table.
+"""
+import random
+
+LINES_PER_PAGE = 45
+
+HEADER = [
+    "Expediente: 123456 HIM: 987654 PEREZ LOPEZ, JUAN CARLOS Fecha de Nacimiento: 01/02/1970 Masculino (54 años)",
+    "Fecha de Ingreso: 01/03/2024 08:30 Dado de Alta: 05/03/2024 12:00",
+    "Hospital San José",
+    "No. 4567",
+    "Nota de Evolución Derechos de Autor",
+]
+
+FOOTER = "Firmado por: DR JUAN PEREZ GARCIA - 02/03/2024 10:15 CED. PROF.: 1234567"
+
+MEDICAMENTOS = ["PARACETAMOL 500 MG TAB", "ENOXAPARINA 40 MG/0.4 ML SOL INY", "OMEPRAZOL 40 MG AMP", "CEFTRIAXONA 1 G AMP"]
+
+
+def _fecha(n):
+    return f"{1 + n % 28:02d}/03/2024 {n % 24:02d}:{(n * 7) % 60:02d}"
+
+
+def vital_signs_row(t, rnd):
+    """A row of a vital signs table at datetime t, as the ingestion stores it."""
+    return {"Fecha/Hora": t.strftime("%d/%m/%Y %H:%M"), "FR": str(rnd.randint(12, 24)), "FC": str(rnd.randint(60, 110)),
+            "PAS": str(rnd.randint(100, 140)), "PAD": str(rnd.randint(60, 90)), "SAT_O2": str(rnd.randint(88, 99)),
+            "Temp_°C": f"{rnd.uniform(35.5, 38.5):.1f}", "Peso": "70", "Talla": "170"}
+
+
+def body_lines(rows=10, seed=0):
+    """Returns the body lines of a note with `rows` rows in each table."""
+    rnd = random.Random(seed)
+    lines = ["Signos Vitales - Últimas 24 horas",
+             "Fecha/Hora   FR   FC   PAS   PAD   SAT O2   Temp °C   Peso   Talla   "]
+    for n in range(rows):
+        lines.append(f"{_fecha(n)} {rnd.randint(12, 24)}   {rnd.randint(60, 110)}   {rnd.randint(100, 140)}   "
+                     f"{rnd.randint(60, 90)}   {rnd.randint(88, 99)}   {rnd.uniform(35.5, 38.5):.1f}   70   170   ")
+    lines += [" ", "Subjetivo", "- Paciente refiere dolor abdominal leve", "- Tolera la vía oral",
+              "Diagnósticos Activos", "Fecha Ingresada   Descripción   Tipo   Médico   Notas   "]
+    for n in range(rows):
+        lines.append(f"{_fecha(n)} Neumonía adquirida en la comunidad   Principal   DR JUAN PEREZ   En tratamiento   ")
+    lines += [" ", "Examen Físico", "Paciente consciente, orientado.", "Notas", "Sin cambios relevantes.",
+              "Análisis/Condición", "Evolución favorable.", "Comentar estudio(s)", "Biometría hemática normal.",
+              "Plan de Tratamiento", "Continuar manejo.",
+              "Órdenes de Dietéticas Activas", "Fecha Ingresada   Tipo   Tipo Terapéutico   Notas   "]
+    for n in range(rows):
+        lines.append(f"{_fecha(n)} Dieta   Blanda   Hiposódica   ")
+    lines += [" ", "Órdenes de Enfermería Activas", "Fecha Ingresada   Orden   Médico   "]
+    for n in range(rows):
+        lines.append(f"{_fecha(n)} Control de signos vitales cada 4 horas   DR JUAN PEREZ   ")
+    lines += [" ", "Órdenes de Medicamentos Hospitalarios",
+              "Inicio   Medicamento   Frecuencia   Via   Dosis   UDM   Cantidad   Tipo   Médico   Tasa de Flujo   "]
+    for n in range(rows):
+        lines.append(f"{_fecha(n)} {rnd.choice(MEDICAMENTOS)}   c/8h   Intravenosa   1   mg   1   Programado   DR JUAN PEREZ   -   ")
+    lines += [" ", FOOTER]
+    return lines
+
+
+def note_pages(pages=1, rows=None):
+    """Returns the note as a list of page texts. By default the tables grow with the page count."""
+    if rows is None:
+        rows = max(1, (pages * (LINES_PER_PAGE - len(HEADER)) - 40) // 5)
+    lines = body_lines(rows)
+    per_page = LINES_PER_PAGE - len(HEADER)
+    result = []
+    for n in range(pages):
+        chunk = lines[n * per_page:(n + 1) * per_page] if n < pages - 1 else lines[n * per_page:]
+        result.append("\n".join(HEADER + chunk) + "\n")
+    return result
+
+
+def note_text(pages=1, rows=None):
+    """Returns the full text of a synthetic note, as PyPDF2 would concatenate it."""
+    return "".join(note_pages(pages, rows))
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("cp1252", "replace")
+
+
+def note_pdf(pages=1, rows=None):
+    """Builds a text PDF (Helvetica, WinAnsi) with one PDF page per synthetic note page."""
+    page_texts = note_pages(pages, rows)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for text in page_texts:
+        stream = b"BT /F1 7 Tf 9 TL 20 820 Td " + b" T* ".join(
+            b"(" + _pdf_escape(line) + b") Tj" for line in text.split("\n")) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,84 @@
+"""
+Files/minute through /documents/upload (one request per file) vs /documents/upload/batch
+(a single ZIP with every file).
+
+Runs against a live API and creates documents, so use a development database.
+By default it measures until every file is accepted (stored and queued); with
+--wait it also waits until the ingestion workers have analyzed all of them, so
+start some first (`python worker.py --processes 4`). Requires httpx.
+
+    cd api && python -m benchmarks.bench_batch_upload --email admin@example.com --password adminpassword --files 200
+"""
+import argparse
+import asyncio
+import io
+import time
+import zipfile
+
+import httpx
+
+from benchmarks._synthetic import note_pdf
+
+
+async def _wait_analyzed(client, headers, document_ids):
+    pending = set(document_ids)
+    while pending:
+        await asyncio.sleep(0.5)
+        for status in ("analyzed", "failed"):
+            response = await client.get("/documents/", params={"status": status}, headers=headers)
+            pending -= {doc["id"] for doc in response.json()}
+
+
+async def single(client, headers, pdfs):
+    document_ids = []
+    for n, pdf in enumerate(pdfs):
+        response = await client.post("/documents/upload", headers=headers,
+                                     files={"file": (f"nota_{n}.pdf", pdf, "application/pdf")})
+        response.raise_for_status()
+        document_ids.append(response.json()["id"])
+    return document_ids
+
+
+async def batch(client, headers, pdfs):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for n, pdf in enumerate(pdfs):
+            zf.writestr(f"notas/nota_{n}.pdf", pdf)
+    response = await client.post("/documents/upload/batch", headers=headers,
+                                 files={"files": ("notas.zip", archive.getvalue(), "application/zip")})
+    response.raise_for_status()
+    result = response.json()
+    assert result["failed"] == 0, result
+    return [item["document_id"] for item in result["items"]]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--wait", action="store_true", help="also wait for the workers to analyze every file")
+    args = parser.parse_args()
+
+    pdf = note_pdf(args.pages)
+    async with httpx.AsyncClient(base_url=args.url, timeout=600) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        print(f"{'path':<8} {'files':>6} {'seconds':>8} {'files/min':>10}")
+        for name, upload in (("single", single), ("batch", batch)):
+            # Bytes distintos por archivo, como documentos distintos
+            pdfs = [pdf + b"%% %s %d\n" % (name.encode(), n) for n in range(args.files)]
+            start = time.perf_counter()
+            document_ids = await upload(client, headers, pdfs)
+            if args.wait:
+                await _wait_analyzed(client, headers, document_ids)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8} {args.files:>6} {elapsed:>8.1f} {args.files / elapsed * 60:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
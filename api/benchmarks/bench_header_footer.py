@@ -0,0 +1,64 @@
+"""
+Header/footer field extraction on large notes: label-driven sweep vs one regex per field.
+
+"before" runs the per-field re.findall/re.sub calls HeaderFooterToDf used (without
+the DataFrame handling); "after" is HeaderFooterToDf.extraer_campos.
+
+    cd api && python -m benchmarks.bench_header_footer
+"""
+import argparse
+import re
+import time
+
+from app.utils.helpers import HeaderFooterToDf
+from benchmarks._synthetic import note_text
+
+
+def _campos_anteriores(text):
+    """The per-field regexes of the previous get_head/get_patient_data/get_medical_data"""
+    campos = {}
+    campos["No_nota"] = re.findall(r"\nNo.\s*([\d]+)", text)
+    campos["Tipo_nota"] = re.search(r"(.+)\s*Derechos de Autor", text)
+    campos["No_Expediente"] = re.findall(r"Expediente:\s*([\d]+)", text)
+    campos["HIM"] = re.findall(r"HIM:\s*([\d]+)", text)
+    new_header = re.sub(r"HIM:\s*([\d]+)", r" Nombre Completo: ", text)
+    campos["Nombre"] = re.findall(r"Nombre Completo:\s*(.*?)Fecha", new_header)
+    campos["Fecha_nacimiento"] = re.findall(r"Fecha de Nacimiento:\s*(\d{2}/\d{2}/\d{4})", text)
+    campos["Sexo"] = re.findall(r"\b(Femenino|Masculino)\b", text)
+    campos["Edad"] = re.findall(r"(?:Femenino|Masculino)\s*\((\d+)\s*(años|meses|días?)\)", text)
+    campos["Fecha_ingreso"] = re.findall(r"Fecha de Ingreso:\s*(\d{2}/\d{2}/\d{4})", text)
+    campos["Hora_ingreso"] = re.findall(r"Fecha de Ingreso:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})", text)
+    campos["Fecha_alta"] = re.findall(r"Dado de Alta:\s*(\d{2}/\d{2}/\d{4})", text)
+    campos["Hora_alta"] = re.findall(r"Dado de Alta:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})", text)
+    campos["Firmado_por"] = re.findall(r"Firmado por:\s*(.*?)-", text)
+    campos["Cedula_profesional"] = re.findall(r"PROF.:\s*([\d]+)", text)
+    new_header = re.sub(r"Firmado por:\s*(.*?)-", r"Creacion: ", text)
+    campos["Fecha_creacion"] = re.findall(r"Creacion:\s*(\d{2}/\d{2}/\d{4})", new_header)
+    campos["Hora_creacion"] = re.findall(r"Creacion:\s*(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2})", new_header)
+    campos["Hospital"] = re.findall(r"Hospital\s*(.*?)\n", text)
+    return campos
+
+
+def _per_doc_ms(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 80, 400])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'KB':>7} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for pages in args.pages:
+        text = note_text(pages)
+        before = _per_doc_ms(_campos_anteriores, text, args.repeat)
+        after = _per_doc_ms(HeaderFooterToDf.extraer_campos, text, args.repeat)
+        print(f"{pages:>6} {len(text) / 1024:>7.0f} {before:>10.2f} {after:>9.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
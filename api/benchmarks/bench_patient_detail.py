@@ -0,0 +1,66 @@
+"""
+Bytes transferred and p50 latency of the patient detail screen: the patient and
+the four lists its overview tab counts (notes, prescriptions, vital signs and
+dietetic orders), requested in parallel like the frontend does, with the full
+records vs ?view=summary, and the same data (plus doctors and documents) from
+the single /timeline request.
+
+Runs against a live API; use a patient with several analyzed notes
+(--patient-id, by default the newest patient). Requires httpx.
+
+    cd api && python -m benchmarks.bench_patient_detail --email admin@example.com --password adminpassword
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+SCREEN = ["", "/notes", "/prescriptions", "/vital-signs", "/dietetic-orders"]
+VIEWS = [
+    ("full", SCREEN, ""),
+    ("summary", SCREEN, "?view=summary"),
+    ("timeline", ["/timeline"], ""),
+]
+
+
+async def _load_screen(client, headers, patient_id, paths, query):
+    responses = await asyncio.gather(*(
+        client.get(f"/patients/{patient_id}{path}{query if path else ''}", headers=headers) for path in paths
+    ))
+    return sum(len(response.content) for response in responses), [
+        f"{path or '/'} {response.status_code}" for path, response in zip(paths, responses) if response.status_code != 200
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--patient-id")
+    parser.add_argument("--requests", type=int, default=50, help="screen loads per view")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        patient_id = args.patient_id or (await client.get("/patients/?limit=1", headers=headers)).json()[0]["id"]
+
+        print(f"{'view':<8} {'requests':>8} {'bytes':>10} {'p50 ms':>8} {'p95 ms':>8}  errors")
+        for view, paths, query in VIEWS:
+            latencies = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                size, errors = await _load_screen(client, headers, patient_id, paths, query)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            print(f"{view:<8} {len(paths):>8} {size:>10} {statistics.median(latencies):>8.1f} "
+                  f"{latencies[int(len(latencies) * 0.95) - 1]:>8.1f}  {', '.join(errors) or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""
+Serial vs page-parallel PDF text extraction (Utils.get_text_from_pdf).
+
+    cd api && python -m benchmarks.bench_pdf_extraction --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.utils.helpers import Utils
+from benchmarks._synthetic import note_pdf
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Arranca el pool antes de medir para no contar el fork de los workers
+    Utils.get_text_from_pdf(note_pdf(2), workers=args.workers)
+
+    print(f"{'pages':>6} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"note_{pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(note_pdf(pages))
+
+            serial, serial_text = _best_of(lambda: Utils.get_text_from_pdf(path), args.repeat)
+            parallel, parallel_text = _best_of(lambda: Utils.get_text_from_pdf(path, workers=args.workers), args.repeat)
+            assert parallel_text == serial_text, "parallel extraction differs from serial output"
+            print(f"{pages:>6} {serial * 1000:>10.1f} {parallel * 1000:>12.1f} {serial / parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+DocumentProcessor tables and header without pandas vs the DataFrame round trip.
+
+"before" reproduces what process_text used to do with pandas: one-row DataFrames
+for the header/footer (pd.concat, df.at) and a DataFrame per table converted back
+with iterrows(); "after" runs the row pipeline (ExtractTables.extraer_registros and
+HeaderFooterToDf.extraer_campos). Both start from the same SectionIndex.
+
+It also measures the import time of app.utils.document_processor in a fresh
+interpreter, with and without pandas being imported.
+
+    cd api && python -m benchmarks.bench_processor_rows
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from app.utils.document_processor import DocumentProcessor
+from app.utils.helpers import ExtractTables, HeaderFooterToDf, SectionIndex, Utils
+from benchmarks._synthetic import note_text
+
+TABLAS = [
+    ("Signos Vitales", DocumentProcessor.signos_vitales_lst),
+    ("Diagnósticos Activos", DocumentProcessor.diagnosticos_activos_lst),
+    ("Órdenes de Dietéticas Activas", DocumentProcessor.ordenes_dieteticas_lst),
+    ("Órdenes de Enfermería Activas", DocumentProcessor.ordenes_enfermeria_lst),
+    ("Órdenes de Medicamentos Hospitalarios", DocumentProcessor.medicamentos_hospitalarios_lst),
+]
+
+
+def _df_to_dict(df, columns):
+    if df.empty:
+        return []
+    df = df.rename(columns={col: col.replace(" ", "_") for col in df.columns})
+    return [{col: row.get(col, '') for col in columns} for _, row in df.iterrows()]
+
+
+def with_pandas(text):
+    import pandas as pd
+
+    df_head = HeaderFooterToDf.get_head(text, pd.DataFrame(columns=list(HeaderFooterToDf.CAMPOS_NOTA)))
+    df_name = HeaderFooterToDf.get_patient_data(text, pd.DataFrame(columns=list(HeaderFooterToDf.CAMPOS_PACIENTE)))
+    df_medical = HeaderFooterToDf.get_medical_data(text, pd.DataFrame(columns=list(HeaderFooterToDf.CAMPOS_MEDICOS)))
+    header = {**df_head.iloc[0].to_dict(), **df_name.iloc[0].to_dict(), **df_medical.iloc[0].to_dict()}
+
+    indice = SectionIndex(text)
+    Utils.get_signos_vitales(indice)
+    Utils.get_diagnosticos_activos(indice)
+    tablas = [_df_to_dict(ExtractTables.extraer_tabla(indice, seccion), columns) for seccion, columns in TABLAS]
+    return header, tablas
+
+
+def without_pandas(text):
+    header = HeaderFooterToDf.extraer_campos(text)
+
+    indice = SectionIndex(text)
+    Utils.get_signos_vitales(indice, tabla=False)
+    Utils.get_diagnosticos_activos(indice, tabla=False)
+    tablas = []
+    for seccion, columns in TABLAS:
+        rows = ExtractTables.extraer_registros(indice, seccion)
+        rows = [{col.replace(" ", "_"): value for col, value in row.items()} for row in rows]
+        tablas.append([{col: row.get(col, '') for col in columns} for row in rows])
+    return header, tablas
+
+
+def _per_doc_ms(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _import_ms(statement, repeat=5):
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    runs = [float(subprocess.check_output([sys.executable, "-c", code])) for _ in range(repeat)]
+    return min(runs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 80])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for pages in args.pages:
+        text = note_text(pages)
+        assert with_pandas(text)[1] == without_pandas(text)[1]
+        before = _per_doc_ms(with_pandas, text, args.repeat)
+        after = _per_doc_ms(without_pandas, text, args.repeat)
+        print(f"{pages:>6} {before:>10.2f} {after:>9.2f} {before / after:>7.1f}x")
+
+    before = _import_ms("import pandas; import app.utils.document_processor")
+    after = _import_ms("import app.utils.document_processor")
+    print(f"\nimport app.utils.document_processor: {before:.0f} ms with pandas, {after:.0f} ms without")
+
+
+if __name__ == "__main__":
+    main()
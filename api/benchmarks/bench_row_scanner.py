@@ -0,0 +1,73 @@
+"""
+Scaling of the table row scanner on synthetic sections of growing size.
+
+Every other row wraps onto a continuation line, which is the case where the
+previous scanner looked up each line with list.index() (quadratic).
+
+    cd api && python -m benchmarks.bench_row_scanner
+"""
+import argparse
+import re
+import time
+
+from app.utils.helpers import ExtractTables
+
+SECCION = "Órdenes de Enfermería Activas"
+
+
+def _econtrar_seccion_anterior(lst, seccion):
+    """The scanner before SectionIndex.escanear, kept here as the baseline"""
+    Bandera = False
+    lst_resultado = []
+    for i in lst:
+        if(Bandera):
+            if(i == ' '):
+                Bandera = False
+            else:
+                date_pattern = re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}")
+                match = date_pattern.search(i)
+                if not(match is None):
+                    lst_resultado.append(i)
+                else:
+                    n = lst.index(i)
+                    match1 = date_pattern.search(lst[n-1])
+                    match2 = date_pattern.search(lst[n+1])
+                    if ((not(match1 is None))&(not(match2 is None))):
+                        lst_resultado.pop()
+        if (i.startswith(seccion)):
+            Bandera = True
+    return lst_resultado
+
+
+def synthetic_section(lines):
+    result = [SECCION, "Fecha Ingresada   Orden   Médico   "]
+    n = 0
+    while len(result) < lines:
+        result.append(f"{1 + n % 28:02d}/03/2024 {n % 24:02d}:00 Control de signos vitales   DR JUAN PEREZ   ")
+        if n % 2:
+            result.append(f"cada {n} horas")
+        n += 1
+    return result + [" "]
+
+
+def _ms(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} {'before ms':>10} {'after ms':>9} {'rows kept before':>17} {'rows kept after':>16}")
+    for lines in args.lines:
+        section = synthetic_section(lines)
+        before, rows_before = _ms(_econtrar_seccion_anterior, section, SECCION)
+        after, rows_after = _ms(ExtractTables.econtrar_seccion, section, SECCION)
+        print(f"{lines:>6} {before:>10.1f} {after:>9.1f} {len(rows_before):>17} {len(rows_after):>16}")
+
+
+if __name__ == "__main__":
+    main()
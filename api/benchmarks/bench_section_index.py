@@ -0,0 +1,54 @@
+"""
+Per-document table/section parsing: one SectionIndex vs re-parsing the text per call.
+
+"before" reproduces the calls DocumentProcessor.process_text used to make on the
+raw text (each one splits and cleans the whole document again); "after" builds a
+single SectionIndex and reads every table and free-text section from it.
+
+    cd api && python -m benchmarks.bench_section_index
+"""
+import argparse
+import time
+
+from app.utils.helpers import ExtractTables, SectionIndex, Utils
+from benchmarks._synthetic import note_text
+
+
+def parse_per_call(text):
+    Utils.get_signos_vitales(text)
+    Utils.get_diagnosticos_activos(text)
+    return [ExtractTables.extraer_tabla(text, seccion) for seccion in SectionIndex.SECCIONES]
+
+
+def parse_indexed(text):
+    indice = SectionIndex(text)
+    Utils.get_signos_vitales(indice)
+    Utils.get_diagnosticos_activos(indice)
+    return [ExtractTables.extraer_tabla(indice, seccion) for seccion in SectionIndex.SECCIONES]
+
+
+def _per_doc_ms(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 80])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for pages in args.pages:
+        text = note_text(pages)
+        for before, after in zip(parse_per_call(text), parse_indexed(text)):
+            assert before.equals(after)
+        before = _per_doc_ms(parse_per_call, text, args.repeat)
+        after = _per_doc_ms(parse_indexed, text, args.repeat)
+        print(f"{pages:>6} {before:>10.2f} {after:>9.2f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Row building throughput of every table section: schema-driven builder vs the
+hand-written match branches it replaced.
+
+Both read the rows from the same SectionIndex, so only the row -> cells step is
+measured.
+
+    cd api && python -m benchmarks.bench_table_schema
+"""
+import argparse
+import time
+
+from app.utils.helpers import ExtractTables, SectionIndex
+from benchmarks._synthetic import note_text
+
+
+def _extract_fecha(renglon):
+    fecha = ""
+    for n in range(17):
+        fecha = fecha + renglon[n]
+    return fecha[:-1]
+
+
+def _filas_anteriores(indice, nombre_seccion):
+    """The per-section branches of extraer_tabla before ExtractTables.ESQUEMAS"""
+    match nombre_seccion:
+        case "Signos Vitales":
+            columns = ['Fecha/Hora', 'FR', 'FC', 'PAS', 'PAD', 'SAT O2', 'Temp °C', 'Peso', 'Talla']
+            tabla_seccion = indice.filas("Signos Vitales")
+            tabla = []
+            for i in tabla_seccion:
+                if (not(i.startswith('Fecha/Hora'))):
+                    datos = []
+                    fecha = _extract_fecha(i)
+                    datos.append(fecha)
+                    fecha = fecha + " "
+                    tmp_string = i.replace(fecha, '')
+                    lista_dividida = tmp_string.split('   ')
+                    lista_dividida.pop()
+                    datos.extend(lista_dividida)
+                    tabla.append(datos)
+            return columns, tabla
+        case "Órdenes de Dietéticas Activas":
+            columns = ['Fecha Ingresada', 'Tipo', 'Tipo Terapéutico', 'Notas']
+            tabla_seccion = indice.filas("Órdenes de Dietéticas Activas")
+            tabla = []
+            for i in tabla_seccion:
+                if (not(i.startswith('Fecha'))):
+                    datos = []
+                    fecha = _extract_fecha(i)
+                    datos.append(fecha)
+                    fecha = fecha + " "
+                    tmp_string = i.replace(fecha, '')
+                    lista_dividida = tmp_string.split('   ')
+                    lista_dividida.pop()
+                    datos.extend(lista_dividida)
+                    tabla.append(datos)
+
+            return columns, tabla
+        case "Diagnósticos Activos":
+            columns = ['Fecha Ingresada', 'Descripción', 'Tipo', 'Médico', 'Notas']
+            tabla_seccion = indice.filas("Diagnósticos Activos")
+            tabla = []
+            for i in tabla_seccion:
+                if (not(i.startswith('Fecha'))):
+                    datos = []
+                    fecha = _extract_fecha(i)
+                    datos.append(fecha)
+                    fecha = fecha + " "
+                    tmp_string = i.replace(fecha, '')
+                    lista_dividida = tmp_string.split('   ')
+                    lista_dividida.pop()
+                    datos.append(lista_dividida[0])
+                    datos.append(lista_dividida[1])
+                    datofinal = lista_dividida[-1]
+                    lista_dividida.pop(0)
+                    lista_dividida.pop(0)
+                    lista_dividida.pop()
+                    cadena = ""
+                    for elemento in lista_dividida:
+                        cadena = cadena + elemento
+                    datos.append(cadena)
+                    datos.append(datofinal)
+                    tabla.append(datos)
+            return columns, tabla
+        case "Órdenes de Enfermería Activas":
+            columns = ['Fecha Ingresada', 'Orden', 'Médico']
+            tabla_seccion = indice.filas("Órdenes de Enfermería Activas")
+            tabla = []
+            for i in tabla_seccion:
+                if (not(i.startswith('Fecha'))):
+                    datos = []
+                    fecha = _extract_fecha(i)
+                    datos.append(fecha)
+                    fecha = fecha + " "
+                    tmp_string = i.replace(fecha, '')
+                    lista_dividida = tmp_string.split('   ')
+                    lista_dividida.pop()
+                    datos.append(lista_dividida[0])
+                    lista_dividida.pop(0)
+                    cadena = ""
+                    for elemento in lista_dividida:
+                        cadena = cadena + elemento      
+                    datos.append(cadena)
+                    tabla.append(datos)
+            return columns, tabla
+        case "Órdenes de Medicamentos Hospitalarios":
+            columns = ["Inicio", "Medicamento", "Frecuencia", "Via", "Dosis", "UDM", "Cantidad", "Tipo", "Médico", "Tasa de Flujo"]
+            tabla_seccion = indice.filas("Órdenes de Medicamentos Hospitalarios")
+            tabla = []
+            for i in tabla_seccion:
+                if (not(i.startswith('Inicio'))):
+                    datos = []
+                    fecha = _extract_fecha(i)
+                    datos.append(fecha)
+                    fecha = fecha + " "
+                    tmp_string = i.replace(fecha, '')
+                    lista_dividida = tmp_string.split('   ')
+                    lista_dividida.pop()
+                    datofinal = lista_dividida[-1]
+                    lista_dividida.pop()
+                    for _ in range(7):
+                        datos.append(lista_dividida[0])
+                        lista_dividida.pop(0)
+                    cadena = ""
+                    for elemento in lista_dividida:
+                        cadena = cadena + elemento
+                    datos.append(cadena)
+                    datos.append(datofinal)
+                    tabla.append(datos)
+            return columns, tabla
+
+
+def _rows_per_s(fn, indice, seccion, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _, tabla = fn(indice, seccion)
+    return len(tabla) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    indice = SectionIndex(note_text(args.pages))
+    print(f"{'section':<40} {'rows':>5} {'before rows/s':>14} {'after rows/s':>13} {'speedup':>8}")
+    for seccion in ExtractTables.ESQUEMAS:
+        assert _filas_anteriores(indice, seccion) == ExtractTables.extraer_filas(indice, seccion)
+        before = _rows_per_s(_filas_anteriores, indice, seccion, args.repeat)
+        after = _rows_per_s(ExtractTables.extraer_filas, indice, seccion, args.repeat)
+        rows = len(indice.filas(seccion))
+        print(f"{seccion:<40} {rows:>5} {before:>14,.0f} {after:>13,.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Latency of the /documents/test-upload-process work per request: the previous
+temp-file path (store the upload, analyze it from disk, delete it) on a
+disk-backed directory and on tmpfs, vs the in-memory analysis it uses now.
+
+Analysis runs inline with the text cache off, so every request parses the PDF.
+Only the storage changes between rows.
+
+    cd api && python -m benchmarks.bench_test_upload_storage --disk-dir /var/tmp --tmpfs-dir /dev/shm
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+# Antes de importar la app
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+os.environ["TEXT_CACHE_ENABLED"] = "false"
+os.environ["ANALYSIS_WORKERS"] = "0"
+
+from app.utils.document_processor import DocumentProcessor
+from app.utils.storage import read_pdf, store_file
+from benchmarks._synthetic import note_pdf
+
+
+async def via_file(pdf, upload_dir):
+    stored = store_file(BytesIO(pdf), "nota.pdf", upload_dir)
+    try:
+        return await DocumentProcessor(stored.path).analyze()
+    finally:
+        os.remove(stored.path)
+
+
+async def in_memory(pdf):
+    return await DocumentProcessor(read_pdf(BytesIO(pdf))).analyze()
+
+
+async def _measure(fn, requests):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1], statistics.mean(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--disk-dir", default="/var/tmp", help="directory on a disk-backed filesystem")
+    parser.add_argument("--tmpfs-dir", default="/dev/shm", help="directory on tmpfs")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 60])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'pages':>5} {'storage':<8} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    with tempfile.TemporaryDirectory(dir=args.disk_dir) as disk, tempfile.TemporaryDirectory(dir=args.tmpfs_dir) as tmpfs:
+        for pages in args.pages:
+            pdf = note_pdf(pages)
+            expected = await in_memory(pdf)
+            assert await via_file(pdf, disk) == expected, "in-memory analysis differs from the file-based one"
+
+            for name, fn in (("disk", lambda: via_file(pdf, disk)),
+                             ("tmpfs", lambda: via_file(pdf, tmpfs)),
+                             ("memory", lambda: in_memory(pdf))):
+                p50, p95, mean = await _measure(fn, args.requests)
+                print(f"{pages:>5} {name:<8} {p50:>8.2f} {p95:>8.2f} {mean:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
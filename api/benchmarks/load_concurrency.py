@@ -0,0 +1,81 @@
+"""
+Requests/second of read endpoints with 50 and 200 concurrent clients.
+
+Runs against a live API: each client sends requests back to back, cycling
+through --path, for --duration seconds per concurrency level. Run it against a
+deployment with the previous synchronous pymongo data layer and against this
+one, with the same database and uvicorn settings, to compare them. Requires httpx.
+
+    cd api && python -m benchmarks.load_concurrency --email admin@example.com --password adminpassword --concurrency 50 200
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+import httpx
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def _client(client, headers, paths, stop, latencies, errors):
+    for path in itertools.cycle(paths):
+        if stop.is_set():
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def _level(args, headers, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        stop = asyncio.Event()
+        latencies, errors = [], {}
+        tasks = [asyncio.create_task(_client(client, headers, args.path, stop, latencies, errors))
+                 for _ in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        return latencies, errors, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", action="append", help="endpoint to request (repeatable); default /patients/ and /documents/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency level")
+    args = parser.parse_args()
+    args.path = args.path or ["/patients/", "/documents/"]
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    print(f"{'clients':>7} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}  errors")
+    for concurrency in args.concurrency:
+        latencies, errors, elapsed = await _level(args, headers, concurrency)
+        if not latencies:
+            print(f"{concurrency:>7} {0:>8} {0:>8.1f} {'-':>8} {'-':>8}  {errors}")
+            continue
+        print(f"{concurrency:>7} {len(latencies):>8} {len(latencies) / elapsed:>8.1f} {_percentile(latencies, 50):>8.1f} "
+              f"{_percentile(latencies, 99):>8.1f}  {errors or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Latency of GET /patients while documents are being analyzed by the API.
+
+Runs against a live API: first GET /patients alone, then the same load while
+`--uploads` clients keep sending synthetic notes of `--pages` pages to
+/documents/test-upload-process, which analyzes them in the API process without
+storing anything. Each upload gets a unique PDF so the text cache does not
+short-circuit it. Compare a run with ANALYSIS_WORKERS=0 (analysis in the event
+loop) against one with the analysis pool. Requires httpx.
+
+    cd api && python -m benchmarks.load_patients_p99 --email admin@example.com --password admin
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks._synthetic import note_pdf
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def _reader(client, headers, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/patients/", headers=headers)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def _uploader(client, headers, stop, pdf, counter, statuses):
+    while not stop.is_set():
+        counter[0] += 1
+        # Bytes distintos después de %%EOF: mismo contenido, otra llave de caché
+        data = pdf + b"%% upload %d\n" % counter[0]
+        response = await client.post("/documents/test-upload-process", headers=headers,
+                                     files={"file": (f"nota_{counter[0]}.pdf", data, "application/pdf")})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+
+async def _phase(client, headers, args, pdf, uploads):
+    stop = asyncio.Event()
+    latencies, statuses, counter = [], {}, [0]
+    tasks = [asyncio.create_task(_reader(client, headers, stop, latencies)) for _ in range(args.readers)]
+    tasks += [asyncio.create_task(_uploader(client, headers, stop, pdf, counter, statuses)) for _ in range(uploads)]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return latencies, statuses
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--uploads", type=int, default=4, help="concurrent upload clients")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent GET /patients clients")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    args = parser.parse_args()
+
+    pdf = note_pdf(args.pages)
+    async with httpx.AsyncClient(base_url=args.url, timeout=300) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        print(f"{'phase':<18} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  uploads by status")
+        for name, uploads in (("idle", 0), (f"{args.uploads} uploaders", args.uploads)):
+            latencies, statuses = await _phase(client, headers, args, pdf, uploads)
+            print(f"{name:<18} {len(latencies):>8} {_percentile(latencies, 50):>8.1f} "
+                  f"{_percentile(latencies, 99):>8.1f} {max(latencies):>8.1f}  {statuses or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
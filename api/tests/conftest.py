@@ -0,0 +1,118 @@
+"""
+Shared setup of the tests.
+
+The tests that exercise the job queue and the workers run against an in-process
+stand-in of MongoDB: mongomock behind the subset of pymongo's async API the app
+uses. Every call yields to the event loop first, so workers running as
+concurrent tasks interleave their claims the way they would against a server.
+It is installed before the app is imported, since app.core.database creates the
+client at import time. The tests that need a real server (test_index_usage)
+open their own connection and are skipped without one.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Antes de importar la app
+os.environ.setdefault("JWT_SECRET_KEY", "tests")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ["MONGODB_NAME"] = "tests"
+os.environ["TEXT_CACHE_ENABLED"] = "false"
+os.environ["ANALYSIS_WORKERS"] = "0"
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover
+    mongomock = None
+
+
+class _Cursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._cursor)
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(0)
+        return list(self._cursor)[:length] if length else list(self._cursor)
+
+
+class _Collection:
+    def __init__(self, collection):
+        self._collection = collection
+        self.full_name = collection.full_name
+
+    def find(self, *args, **kwargs):
+        return _Cursor(self._collection.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return method(*args, **kwargs)
+        return call
+
+
+class _Database:
+    def __init__(self, database):
+        self._database = database
+
+    def __getattr__(self, name):
+        return _Collection(self._database[name])
+
+    def __getitem__(self, name):
+        return _Collection(self._database[name])
+
+
+class StandInClient:
+    """AsyncMongoClient over one shared mongomock client"""
+    backend = mongomock.MongoClient() if mongomock else None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getitem__(self, name):
+        return _Database(self.backend[name])
+
+    async def aconnect(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+if mongomock is not None:
+    import pymongo
+    pymongo.AsyncMongoClient = StandInClient
+
+
+@pytest.fixture
+def stand_in_db():
+    """Empty stand-in database for the test"""
+    if mongomock is None:
+        pytest.skip("mongomock is not installed")
+    StandInClient.backend.drop_database("tests")
+    yield StandInClient.backend["tests"]
+    StandInClient.backend.drop_database("tests")
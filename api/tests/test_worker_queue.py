@@ -0,0 +1,120 @@
+"""
+Ingestion workers sharing the job queue: two workers drain it processing every
+job exactly once, an expired lease lets another worker take the job over, and
+the heartbeat keeps the lease of a job in progress.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import worker
+from app.core.config import get_settings
+from app.core.database import documents_collection, ingestion_jobs_collection
+from app.models.ingestion_job import JobStatus
+from app.utils import job_queue
+
+
+class _FakeProcessor:
+    """Stands in for DocumentProcessor: takes a while, like the analysis, off the loop"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def analyze_blocking(self):
+        time.sleep(0.01)
+        return self.file_path
+
+
+@pytest.fixture
+def queued_documents(stand_in_db, tmp_path):
+    """Documents with a stored file and a queued job each; returns their ids"""
+    async def queue(count):
+        documents = []
+        for n in range(count):
+            path = tmp_path / f"{n}.pdf"
+            path.write_bytes(b"%PDF")
+            result = await documents_collection.insert_one({"status": "pending"})
+            documents.append((str(result.inserted_id), str(path)))
+        await job_queue.enqueue_jobs(documents)
+        return [document_id for document_id, _ in documents]
+    return queue
+
+
+def test_two_workers_process_each_job_once(queued_documents, monkeypatch):
+    stored = []
+
+    async def store(extracted_data, document_id=None):
+        await asyncio.sleep(0)
+        stored.append(document_id)
+
+    monkeypatch.setattr(worker, "DocumentProcessor", _FakeProcessor)
+    monkeypatch.setattr(worker, "analyze_document_background", store)
+
+    async def run():
+        document_ids = await queued_documents(20)
+        stop = asyncio.Event()
+        processed = await asyncio.gather(
+            worker.run_worker("host-a:1", stop, drain=True),
+            worker.run_worker("host-b:1", stop, drain=True),
+        )
+        jobs = await ingestion_jobs_collection.find().to_list()
+        return document_ids, processed, jobs
+
+    document_ids, processed, jobs = asyncio.run(run())
+
+    assert sorted(stored) == sorted(document_ids)
+    assert all(count > 0 for count in processed) and sum(processed) == len(document_ids)
+    assert {job["status"] for job in jobs} == {JobStatus.SUCCEEDED.value}
+    assert {job["attempts"] for job in jobs} == {1}
+
+
+def test_expired_lease_is_taken_over(queued_documents):
+    async def run():
+        await queued_documents(1)
+        first = await job_queue.claim_job("host-a:1")
+        # Nadie más lo toma mientras el lease está vigente
+        assert await job_queue.claim_job("host-b:1") is None
+
+        # host-a deja de responder y su lease vence
+        await ingestion_jobs_collection.update_one(
+            {"_id": first["_id"]}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        second = await job_queue.claim_job("host-b:1")
+        return first, second, await job_queue.renew_lease(first), await job_queue.complete_job(first), await job_queue.complete_job(second)
+
+    first, second, renewed, first_completed, second_completed = asyncio.run(run())
+
+    assert second["_id"] == first["_id"]
+    assert second["worker_id"] == "host-b:1" and second["attempts"] == 2
+    # El worker que lo perdió ya no puede renovarlo ni completarlo
+    assert not renewed and not first_completed
+    assert second_completed
+
+
+def test_heartbeat_keeps_the_lease(queued_documents, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ingestion_lease_seconds", 0.3)
+
+    async def run():
+        await queued_documents(1)
+        job = await job_queue.claim_job("host-a:1")
+        heartbeat = worker.LeaseHeartbeat(job, interval=0.05)
+        heartbeat.start()
+
+        # Pasa más de un lease completo: el heartbeat lo renovó
+        await asyncio.sleep(0.6)
+        taken_while_alive = await job_queue.claim_job("host-b:1")
+
+        # Otro worker se lo queda: el siguiente heartbeat lo detecta
+        await ingestion_jobs_collection.update_one({"_id": job["_id"]}, {"$set": {"worker_id": "host-b:1"}})
+        await asyncio.sleep(0.15)
+        lost = heartbeat.lost
+        await heartbeat.stop()
+        return taken_while_alive, lost
+
+    taken_while_alive, lost = asyncio.run(run())
+
+    assert taken_while_alive is None
+    assert lost
@@ -0,0 +1,4 @@
+from app.worker import main
+
+if __name__ == "__main__":
+    main()
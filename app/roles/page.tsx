@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react'
 import { useAuth } from '@/contexts/auth-context'
 import { Resource, Action } from '@/lib/roles'
 import api from '@/lib/axios'
+import { getAllPages } from '@/lib/pagination'
 import { toast } from 'react-hot-toast'
 
 interface Role {
@@ -31,8 +32,7 @@ export default function RolesPage() {
 
   const fetchRoles = async () => {
     try {
-      const response = await api.get('/roles')
-      setRoles(response.data)
+      setRoles(await getAllPages<Role>('/roles'))
     } catch (error) {
       console.error('Error fetching roles:', error)
       toast.error('Failed to fetch roles')
@@ -16,7 +16,7 @@ import {
 } from "@/components/ui/dropdown-menu"
 import { Input } from "@/components/ui/input"
 import { useAuth } from "@/contexts/auth-context"
-import api from "@/lib/axios"
+import { getAllPages } from "@/lib/pagination"
 import { useToast } from "@/hooks/use-toast"
 import Link from "next/link"
 import { Patient } from "@/types/patient"
@@ -32,8 +32,8 @@ export function PatientList() {
   const fetchPatients = async () => {
     setLoading(true)
     try {
-      const response = await api.get('/patients/')
-      setPatients(response.data)
+      // La búsqueda filtra en el navegador: se cargan todas las páginas
+      setPatients(await getAllPages<Patient>('/patients/'))
     } catch (error: any) {
       console.error('Error fetching patients:', error)
       toast({
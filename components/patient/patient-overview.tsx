@@ -30,12 +30,12 @@ export default function PatientOverview({ patient }: PatientOverviewProps) {
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        // Fetch all stats in parallel
+        // Fetch all stats in parallel; only the counts are shown, so the summary view is enough
         const [notesRes, prescriptionsRes, vitalSignsRes, dietticOrdersRes] = await Promise.all([
-          api.get(`/patients/${patient.id}/notes`).catch(() => ({ data: [] })),
-          api.get(`/patients/${patient.id}/prescriptions`).catch(() => ({ data: [] })),
-          api.get(`/patients/${patient.id}/vital-signs`).catch(() => ({ data: [] })),
-          api.get(`/patients/${patient.id}/dietetic-orders`).catch(() => ({ data: [] })),
+          api.get(`/patients/${patient.id}/notes?view=summary`).catch(() => ({ data: [] })),
+          api.get(`/patients/${patient.id}/prescriptions?view=summary`).catch(() => ({ data: [] })),
+          api.get(`/patients/${patient.id}/vital-signs?view=summary`).catch(() => ({ data: [] })),
+          api.get(`/patients/${patient.id}/dietetic-orders?view=summary`).catch(() => ({ data: [] })),
         ]);
 
         setStats({
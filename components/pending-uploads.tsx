@@ -7,6 +7,7 @@ import { Badge } from "@/components/ui/badge"
 import { Clock, Eye, FileText, Trash2, RefreshCw } from "lucide-react"
 import { useAuth } from "@/contexts/auth-context"
 import api from "@/lib/axios"
+import { getAllPages } from "@/lib/pagination"
 import { useToast } from "@/hooks/use-toast"
 
 // Define the upload record type based on backend Document model
@@ -40,8 +41,7 @@ export function PendingUploads() {
   const fetchUploads = async () => {
     setLoading(true)
     try {
-      const response = await api.get('/documents/')
-      setUploads(response.data)
+      setUploads(await getAllPages<UploadRecord>('/documents/'))
     } catch (error: any) {
       console.error('Error fetching uploads:', error)
       toast({
@@ -0,0 +1,19 @@
+import api from './axios'
+
+// Las listas del API vienen por páginas: el token de la siguiente llega en este
+// encabezado y falta en la última (api/app/utils/pagination.py)
+const NEXT_CURSOR_HEADER = 'x-next-cursor'
+// Máximo que acepta el API por página
+const PAGE_LIMIT = 1000
+
+// Get every record of a paginated list, following the next-page cursor
+export async function getAllPages<T>(url: string, params: Record<string, any> = {}): Promise<T[]> {
+  const records: T[] = []
+  let cursor: string | undefined
+  do {
+    const response = await api.get<T[]>(url, { params: { ...params, limit: PAGE_LIMIT, cursor } })
+    records.push(...response.data)
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+  } while (cursor)
+  return records
+}
@@ -1,4 +1,5 @@
 import api from './axios'
+import { getAllPages } from './pagination'
 
 export interface User {
   id: string
@@ -27,8 +28,7 @@ export interface UserUpdate {
 export const usersApi = {
   // Get all users
   getUsers: async (): Promise<User[]> => {
-    const response = await api.get('/users/')
-    return response.data
+    return getAllPages<User>('/users/')
   },
 
   // Get user by ID